@@ -1,9 +1,13 @@
+import asyncio
 import logging
 import json
+import time
+from contextlib import aclosing
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 
+from ...core.admission import AdmissionRejected
 from ...core.settings import settings
 from ...legal_agent.agent.agent_runner import get_agent_runner
 
@@ -20,25 +24,112 @@ async def stream_chat(request: Request, chat_request: ChatRequest):
     if not chat_request.query:
         raise HTTPException(status_code=400, detail="Query is required.")
 
+    agent_status = getattr(request.app.state, "agent_status", "ready")
+    if agent_status == "loading":
+        raise HTTPException(
+            status_code=503,
+            detail="Agent is still loading, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
     try:
-        
-        agent_runner = get_agent_runner()
+        agent_runner = await asyncio.to_thread(get_agent_runner)
     except Exception as e:
         logger.error(f"Failed to initialize Agent Runner: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Agent initialization failed: {e}")
 
+    request_limiter = agent_runner.admission.requests
+    try:
+        request_limiter.check_capacity()
+    except AdmissionRejected as e:
+        logger.warning(f"Rejecting chat request: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="Server is busy, please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
     async def event_generator():
+        admitted = False
+        stream_task = watcher_task = None
         try:
-            async for event in agent_runner.stream_run(chat_request.query):
-                if await request.is_disconnected():
-                    logger.warning("Client disconnected, stopping stream.")
-                    break
-                
+            async for position in request_limiter.wait_for_slot():
+                yield {"data": json.dumps({"type": "queued", "position": position})}
+            admitted = True
+            start_time = time.perf_counter()
+
+            events = asyncio.Queue(maxsize=settings.STREAM_QUEUE_SIZE)
+            stream_task = asyncio.create_task(_run_agent(agent_runner, chat_request.query, events))
+            watcher_task = asyncio.create_task(_cancel_on_disconnect(request, stream_task))
+            while (event := await events.get()) is not None:
                 yield {"data": json.dumps(event)}
 
-        except Exception as e:
-            logger.error(f"Error during agent execution stream: {e}", exc_info=True)
-            error_event = {"type": "error", "data": str(e)}
+        except AdmissionRejected as e:
+            logger.warning(f"Chat request left the queue: {e}")
+            error_event = {"type": "error", "data": str(e), "retry_after": e.retry_after}
             yield {"data": json.dumps(error_event)}
+        finally:
+            # Also reached when sse-starlette cancels this generator on its own disconnect check.
+            for task in (watcher_task, stream_task):
+                if task is not None:
+                    task.cancel()
+            if admitted:
+                request_limiter.release(time.perf_counter() - start_time)
+
+    return EventSourceResponse(event_generator())
+
+
+async def _put_event(events: asyncio.Queue, item) -> bool:
+    try:
+        await asyncio.wait_for(events.put(item), settings.STREAM_CLIENT_TIMEOUT_SECONDS)
+        return True
+    except TimeoutError:
+        return False
+
+
+def _abandon_stream(events: asyncio.Queue):
+    # Drop undelivered events so the end marker always fits.
+    while not events.empty():
+        events.get_nowait()
+    events.put_nowait(None)
+
+
+async def _run_agent(agent_runner, query: str, events: asyncio.Queue):
+    """Run the agent in its own task so a disconnect can cancel it mid-node; ``None`` marks the end.
+
+    ``events`` is bounded, so a client that reads slowly blocks this task and,
+    through the agent's own bounded queue, the node streaming the answer. A
+    client that takes nothing for ``STREAM_CLIENT_TIMEOUT_SECONDS`` while still
+    connected has its run cancelled.
+    """
+    error = None
+    try:
+        async with aclosing(agent_runner.stream_run(query)) as stream:
+            async for event in stream:
+                if not await _put_event(events, event):
+                    logger.warning("Client stopped reading the stream, cancelling the agent run.")
+                    _abandon_stream(events)
+                    return
+    except asyncio.CancelledError:
+        _abandon_stream(events)
+        raise
+    except AdmissionRejected as e:
+        logger.warning(f"Agent run rejected while waiting for capacity: {e}")
+        error = {"type": "error", "data": str(e), "retry_after": e.retry_after}
+    except Exception as e:
+        logger.error(f"Error during agent execution stream: {e}", exc_info=True)
+        error = {"type": "error", "data": str(e)}
+
+    for item in ([error] if error else []) + [None]:
+        if not await _put_event(events, item):
+            _abandon_stream(events)
+            return
+
 
-    return EventSourceResponse(event_generator())
\ No newline at end of file
+async def _cancel_on_disconnect(request: Request, stream_task: asyncio.Task):
+    while not stream_task.done():
+        if await request.is_disconnected():
+            logger.warning("Client disconnected, cancelling the agent run.")
+            stream_task.cancel()
+            return
+        await asyncio.sleep(settings.DISCONNECT_POLL_SECONDS)
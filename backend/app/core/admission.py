@@ -0,0 +1,150 @@
+"""Admission control: bounded, first-come-first-served concurrency limits.
+
+One limiter guards whole chat requests and reports queue positions to the
+client; separate limiters bound concurrent LLM calls and embedding/retrieval
+work inside admitted requests.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FairLimiter:
+    """Async concurrency limiter with a FIFO queue, a queue cap and a max wait.
+
+    A released slot is handed directly to the oldest waiter, so late arrivals
+    cannot overtake requests that are already queued. ``limit <= 0`` disables
+    the limiter.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int = 0, max_wait: float = 0.0):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters = deque()
+        self._hold_seconds = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a newcomer would likely be admitted, from the average slot hold time."""
+        hold_seconds = self._hold_seconds or 1.0
+        return max(1, math.ceil(hold_seconds * (self.queued + 1) / max(1, self.limit)))
+
+    def check_capacity(self):
+        if self.limit > 0 and self.max_queue > 0 and self.queued >= self.max_queue:
+            raise AdmissionRejected(
+                f"{self.name} queue is full ({self.queued} waiting).", self.retry_after()
+            )
+
+    def _position(self, waiter: asyncio.Future) -> int:
+        try:
+            return self._waiters.index(waiter) + 1
+        except ValueError:
+            return 0
+
+    def _enqueue(self):
+        """Take a free slot immediately (returns ``None``) or join the queue (returns the waiter)."""
+        if self.limit <= 0 or (self.active < self.limit and not self._waiters):
+            self.active += 1
+            return None
+        self.check_capacity()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        elif waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as we gave up; pass it on.
+            self.release()
+
+    async def wait_for_slot(self):
+        """Async generator yielding the 1-based queue position whenever it changes, until admitted.
+
+        Raises ``AdmissionRejected`` if the queue is full or ``max_wait`` elapses.
+        """
+        waiter = self._enqueue()
+        if waiter is None:
+            return
+        deadline = time.monotonic() + self.max_wait if self.max_wait > 0 else None
+        last_position = None
+        try:
+            while not waiter.done():
+                position = self._position(waiter)
+                if position != last_position:
+                    last_position = position
+                    yield position
+                timeout = 0.5
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.monotonic())
+                    if timeout <= 0:
+                        raise AdmissionRejected(
+                            f"Timed out after {self.max_wait:g}s waiting for {self.name}.",
+                            self.retry_after(),
+                        )
+                await asyncio.wait({waiter}, timeout=timeout)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    async def acquire(self):
+        async for _ in self.wait_for_slot():
+            pass
+
+    def release(self, held_seconds: float = None):
+        if self.limit <= 0:
+            return
+        if held_seconds is not None:
+            if self._hold_seconds is None:
+                self._hold_seconds = held_seconds
+            else:
+                self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held_seconds
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start_time)
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "active": self.active, "queued": self.queued}
+
+
+class AdmissionController:
+    def __init__(self, settings):
+        max_wait = settings.ADMISSION_MAX_WAIT_SECONDS
+        self.requests = FairLimiter(
+            "chat requests", settings.MAX_CONCURRENT_REQUESTS, settings.MAX_QUEUED_REQUESTS, max_wait
+        )
+        self.llm = FairLimiter("LLM calls", settings.LLM_MAX_CONCURRENCY, max_wait=max_wait)
+        self.retrieval = FairLimiter("retrieval", settings.RETRIEVAL_MAX_WORKERS, max_wait=max_wait)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests.stats(),
+            "llm": self.llm.stats(),
+            "retrieval": self.retrieval.stats(),
+        }
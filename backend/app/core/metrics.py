@@ -0,0 +1,300 @@
+"""Prometheus metrics for the agent graph and a LangChain callback that feeds them."""
+import asyncio
+import logging
+import os
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+
+from ..legal_agent.tools.token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+REQUEST_DURATION = Histogram(
+    "legal_agent_request_duration_seconds",
+    "Wall time of a full chat stream.",
+    ["route", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+NODE_DURATION = Histogram(
+    "legal_agent_node_duration_seconds",
+    "Wall time of each graph node.",
+    ["node", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_DURATION = Histogram(
+    "legal_agent_llm_duration_seconds",
+    "Wall time of each LLM call, by calling node.",
+    ["node", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "legal_agent_llm_tokens_total",
+    "LLM tokens reported by the provider, by calling node.",
+    ["node", "route", "kind"],
+)
+RETRIEVAL_STAGE_DURATION = Histogram(
+    "legal_agent_retrieval_stage_duration_seconds",
+    "Time spent in each retrieval stage (search, rerank, hydration).",
+    ["stage", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+RETRIEVAL_HITS = Histogram(
+    "legal_agent_retrieval_hits",
+    "Number of hits or context units produced by a retrieval node.",
+    ["node", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 40, 80, 160),
+)
+
+EMBEDDING_BATCH_SIZE = Histogram(
+    "legal_agent_embedding_batch_size",
+    "Texts encoded per batched embedding forward pass.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+EMBEDDING_BATCH_REQUESTS = Histogram(
+    "legal_agent_embedding_batch_requests",
+    "Embedding calls coalesced into one forward pass.",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+EMBEDDING_BATCH_DURATION = Histogram(
+    "legal_agent_embedding_batch_duration_seconds",
+    "Wall time of each batched embedding forward pass.",
+    buckets=LATENCY_BUCKETS,
+)
+
+LLM_MEMO_LOOKUPS = Counter(
+    "legal_agent_llm_memo_lookups_total",
+    "Exact-match LLM memo cache lookups for non-final steps.",
+    ["node", "result"],
+)
+CANCELLED_REQUESTS = Counter(
+    "legal_agent_cancelled_requests_total",
+    "Chat streams cancelled before completion (usually a client disconnect).",
+    ["route"],
+)
+CANCELLED_LLM_CALLS = Counter(
+    "legal_agent_cancelled_llm_calls_total",
+    "LLM calls aborted in flight because their request was cancelled.",
+    ["node", "route"],
+)
+CANCELLED_TOKENS = Counter(
+    "legal_agent_cancelled_llm_tokens_total",
+    "Estimated tokens of aborted LLM calls (prompt sent, completion streamed so far).",
+    ["route", "kind"],
+)
+WASTED_TOKENS = Counter(
+    "legal_agent_wasted_llm_tokens_total",
+    "Tokens of completed LLM calls whose request was cancelled before the answer was delivered.",
+    ["route", "kind"],
+)
+
+
+class EmbeddingCacheCollector:
+    """Reads the embedding cache counters at scrape time, so lookups pay nothing extra."""
+
+    def __init__(self):
+        self.cache = None
+        self.exported = {"hits": 0, "misses": 0}
+
+    def collect(self):
+        stats = self.cache.stats() if self.cache is not None else {"size": 0, "hits": 0, "misses": 0}
+        lookups = CounterMetricFamily(
+            "legal_agent_embedding_cache_lookups", "Embedding cache lookups.", labels=["result"]
+        )
+        lookups.add_metric(["hit"], stats["hits"])
+        lookups.add_metric(["miss"], stats["misses"])
+        yield lookups
+        yield GaugeMetricFamily("legal_agent_embedding_cache_entries", "Embeddings held in memory.", value=stats["size"])
+
+
+_embedding_cache_collector = EmbeddingCacheCollector()
+REGISTRY.register(_embedding_cache_collector)
+
+# Pre-fork mode only sees metric files, so each worker copies its cache counters
+# into these (summed over live workers); they stay off the default registry,
+# where the collector above already exports the same names.
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "legal_agent_embedding_cache_lookups", "Embedding cache lookups.", ["result"], registry=None
+)
+EMBEDDING_CACHE_ENTRIES = Gauge(
+    "legal_agent_embedding_cache_entries", "Embeddings held in memory.", multiprocess_mode="livesum", registry=None
+)
+
+
+def register_embedding_cache(cache):
+    _embedding_cache_collector.cache = cache
+
+
+def sync_embedding_cache_metrics():
+    """Write this worker's embedding cache counters to its multiprocess metric files."""
+    collector = _embedding_cache_collector
+    if collector.cache is None or not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    stats = collector.cache.stats()
+    for result, key in (("hit", "hits"), ("miss", "misses")):
+        delta = stats[key] - collector.exported[key]
+        if delta > 0:
+            EMBEDDING_CACHE_LOOKUPS.labels(result).inc(delta)
+            collector.exported[key] = stats[key]
+    EMBEDDING_CACHE_ENTRIES.set(stats["size"])
+
+
+def render_latest():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Pre-fork mode: aggregate every worker's metric files, the embedding
+        # cache counters included (synced after each run and here).
+        sync_embedding_cache_metrics()
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Per-request callback recording node, LLM and retrieval metrics.
+
+    Runs inline on the event loop and only touches a couple of dicts per event.
+    The route is unknown until the router finishes, so nodes before it are
+    labelled ``unknown``. Prompts are kept by reference and only tokenized if
+    the request is cancelled and its spend has to be estimated.
+    """
+
+    run_inline = True
+
+    def __init__(self, model_name: str = "gpt-4o-mini"):
+        self.model_name = model_name
+        self.route = "unknown"
+        self._node_starts = {}
+        self._llm_calls = {}
+        self._finished_calls = []
+        self._cancelled_calls = []
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, name=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Nested runnables inside a node share its metadata; only time the node itself.
+        if node is not None and name == node:
+            self._node_starts[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        started = self._node_starts.pop(run_id, None)
+        if started is None:
+            return
+        node, start_time = started
+        if isinstance(outputs, dict):
+            self._observe_outputs(node, outputs)
+        NODE_DURATION.labels(node, self.route).observe(time.perf_counter() - start_time)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._node_starts.pop(run_id, None)
+
+    def _observe_outputs(self, node: str, outputs: dict):
+        route = outputs.get("route_decision")
+        if route:
+            self.route = route
+        hits = outputs.get("retrieved_hits")
+        if hits is not None:
+            RETRIEVAL_HITS.labels(node, self.route).observe(len(hits))
+        timings = outputs.get("retrieval_timings")
+        if timings:
+            for key, value in timings.items():
+                if key.endswith("_ms"):
+                    RETRIEVAL_STAGE_DURATION.labels(key[:-3], self.route).observe(value / 1000)
+            if "units" in timings:
+                RETRIEVAL_HITS.labels(node, self.route).observe(timings["units"])
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        self._llm_calls[run_id] = {
+            "node": node,
+            "start_time": time.perf_counter(),
+            "messages": messages,
+            "streamed_tokens": 0,
+        }
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        call = self._llm_calls.get(run_id)
+        if call is not None:
+            call["streamed_tokens"] += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        call = self._llm_calls.pop(run_id, None)
+        if call is None:
+            return
+        LLM_DURATION.labels(call["node"], self.route).observe(time.perf_counter() - call["start_time"])
+        usage = _usage_of(response)
+        if usage:
+            call["prompt_tokens"] = usage.get("input_tokens", 0)
+            call["completion_tokens"] = usage.get("output_tokens", 0)
+            LLM_TOKENS.labels(call["node"], self.route, "prompt").inc(call["prompt_tokens"])
+            LLM_TOKENS.labels(call["node"], self.route, "completion").inc(call["completion_tokens"])
+        self._finished_calls.append(call)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        call = self._llm_calls.pop(run_id, None)
+        if call is not None and isinstance(error, asyncio.CancelledError):
+            self._cancelled_calls.append(call)
+
+    def _call_tokens(self, call: dict) -> tuple[int, int]:
+        prompt_tokens = call.get("prompt_tokens")
+        if prompt_tokens is None:
+            prompt_text = "\n".join(
+                str(message.content) for batch in call["messages"] for message in batch
+            )
+            prompt_tokens = count_tokens(prompt_text, self.model_name)
+        return prompt_tokens, call.get("completion_tokens", call["streamed_tokens"])
+
+    def record_cancellation(self) -> dict:
+        """Count the request as cancelled and attribute its LLM spend; returns the totals."""
+        CANCELLED_REQUESTS.labels(self.route).inc()
+        aborted_calls = self._cancelled_calls + list(self._llm_calls.values())
+        report = {
+            "route": self.route,
+            "aborted_calls": len(aborted_calls),
+            "cancelled_prompt_tokens": 0,
+            "cancelled_completion_tokens": 0,
+            "wasted_prompt_tokens": 0,
+            "wasted_completion_tokens": 0,
+        }
+        for call in aborted_calls:
+            CANCELLED_LLM_CALLS.labels(call["node"], self.route).inc()
+            prompt_tokens, completion_tokens = self._call_tokens(call)
+            report["cancelled_prompt_tokens"] += prompt_tokens
+            report["cancelled_completion_tokens"] += completion_tokens
+        for call in self._finished_calls:
+            prompt_tokens, completion_tokens = self._call_tokens(call)
+            report["wasted_prompt_tokens"] += prompt_tokens
+            report["wasted_completion_tokens"] += completion_tokens
+
+        CANCELLED_TOKENS.labels(self.route, "prompt").inc(report["cancelled_prompt_tokens"])
+        CANCELLED_TOKENS.labels(self.route, "completion").inc(report["cancelled_completion_tokens"])
+        WASTED_TOKENS.labels(self.route, "prompt").inc(report["wasted_prompt_tokens"])
+        WASTED_TOKENS.labels(self.route, "completion").inc(report["wasted_completion_tokens"])
+        self._llm_calls.clear()
+        return report
+
+
+def _usage_of(response) -> dict:
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    if token_usage:
+        return {
+            "input_tokens": token_usage.get("prompt_tokens", 0),
+            "output_tokens": token_usage.get("completion_tokens", 0),
+        }
+    return {}
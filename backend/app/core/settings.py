@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
@@ -15,15 +15,111 @@ class Settings(BaseSettings):
     LANGFUSE_PUBLIC_KEY: Optional[str] = os.getenv("LANGFUSE_PUBLIC_KEY")
     LANGFUSE_HOST: Optional[str] = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
 
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL")
+
     LLM_MODEL_NAME: str = "gpt-4o-mini"
+    LLM_FAST_MODEL_NAME: Optional[str] = None
+    LLM_NODE_MODELS: Dict[str, str] = {}
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_NODE_TIMEOUTS: Dict[str, float] = {
+        "router": 15.0,
+        "simple_keyword_extractor": 20.0,
+        "keyword_extractor": 30.0,
+        # Long prompts full of retrieved context; the first token can take a while.
+        "reasoner": 120.0,
+        "responder": 120.0,
+        "simple_rag": 120.0,
+    }
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    LLM_STREAM_IDLE_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_QUANTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HTTP2: bool = True
+    LLM_MAX_CONNECTIONS: int = 64
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 120.0
+
+    LLM_MEMO_CACHE_ENABLED: bool = True
+    LLM_MEMO_CACHE_NODES: Dict[str, bool] = {
+        "router": True,
+        "simple_keyword_extractor": True,
+        "analyzer": True,
+        "framework_generator": False,
+        "keyword_extractor": False,
+        "reasoner": False,
+    }
+    LLM_MEMO_CACHE_SIZE: int = 4096
+    LLM_MEMO_CACHE_TTL_SECONDS: int = 86400
+    LLM_MEMO_CACHE_SQLITE_PATH: Optional[Path] = None
     EMBEDDING_MODEL_NAME: str = "bkai-foundation-models/vietnamese-bi-encoder"
+    EMBEDDING_BACKEND: Literal["torch", "onnx", "onnx-int8"] = "torch"
+    EMBEDDING_ONNX_DIR: Path = PROJECT_ROOT / "cache" / "embedding_onnx"
+    EMBEDDING_ONNX_QUANTIZATION: str = "avx2"
+    EMBEDDING_NUM_THREADS: int = 0
+    RERANKER_MODEL_NAME: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
 
     DATA_DIR: Path = PROJECT_ROOT / "data"
     LOG_DIR: Path = PROJECT_ROOT / "logs"
     CHROMA_PERSIST_PATH: Path = DATA_DIR / "chroma_db"
     PARSED_JSON_DIR: Path = DATA_DIR / "parsed_json_output"
+    UNIT_STORE_PATH: Path = DATA_DIR / "units.sqlite3"
 
     CHROMA_COLLECTION_NAME: str = "bo_phap_dien_viet_nam"
+    CHROMA_DISTANCE_SPACE: Literal["cosine", "ip"] = "cosine"
+    CHROMA_PARTITIONS_ENABLED: bool = False
+
+    RETRIEVAL_MAX_WORKERS: int = 16
+    RETRIEVAL_MODE: Literal["dense", "hybrid"] = "dense"
+    RETRIEVAL_MIN_SIMILARITY: float = 0.4
+    SCOPED_RETRIEVAL_ENABLED: bool = True
+    RETRIEVAL_SCOPE_MAX_DOCUMENTS: int = 20
+    RETRIEVAL_MAX_PARTITIONS: int = 8
+    RRF_K: int = 60
+
+    RERANK_ENABLED: bool = False
+    RERANK_CANDIDATES: int = 20
+    RERANK_TOP_K: int = 8
+    RERANK_MAX_LATENCY_MS: int = 800
+    SPECULATIVE_ROUTING_ENABLED: bool = False
+    PARALLEL_CASE_ANALYSIS_ENABLED: bool = False
+    UNIT_STORE_CACHE_SIZE: int = 2048
+
+    CONTEXT_HYDRATION_ENABLED: bool = True
+    CONTEXT_TOKEN_BUDGET: int = 6000
+    REASONING_CONTEXT_TOKEN_BUDGET: int = 6000
+    RESPONSE_CONTEXT_TOKEN_BUDGET: int = 6000
+    SIMPLE_RAG_CONTEXT_TOKEN_BUDGET: int = 6000
+
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_MMAP_PATH: Optional[Path] = None
+    EMBEDDING_CACHE_MMAP_SLOTS: int = 65536
+    EMBEDDING_BATCHING_ENABLED: bool = True
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1000
+    SEMANTIC_CACHE_PERSIST: bool = False
+    SEMANTIC_CACHE_PATH: Path = DATA_DIR / "semantic_cache.json"
+    SEMANTIC_CACHE_SAVE_DELAY_SECONDS: float = 5.0
+
+    METRICS_ENABLED: bool = True
+
+    MAX_CONCURRENT_REQUESTS: int = 16
+    MAX_QUEUED_REQUESTS: int = 64
+    ADMISSION_MAX_WAIT_SECONDS: float = 60.0
+    LLM_MAX_CONCURRENCY: int = 8
+    DISCONNECT_POLL_SECONDS: float = 0.5
+
+    STREAM_QUEUE_SIZE: int = 256
+    STREAM_CLIENT_TIMEOUT_SECONDS: float = 30.0
+    STREAM_COALESCE_MS: int = 30
+    STREAM_COALESCE_CHARS: int = 64
 
     def __init__(self, **values):
         super().__init__(**values)
@@ -8,6 +8,11 @@ def decide_route(state: AgentState):
     else:
         return "simple_keyword_extractor"
 
+def decide_route_parallel(state: AgentState):
+    if state.get("route_decision") == "case_analysis":
+        return ["analyzer", "early_keyword_extractor"]
+    return "simple_keyword_extractor"
+
 def after_retrieval_router(state: AgentState):
     if state.get("route_decision") == "case_analysis":
         return "reasoner"
@@ -15,9 +20,13 @@ def after_retrieval_router(state: AgentState):
         return "simple_rag"
 
 def build_agent_graph(runner):
+    parallel_case_analysis = runner.settings.PARALLEL_CASE_ANALYSIS_ENABLED
     workflow = StateGraph(AgentState)
 
-    workflow.add_node("router", runner.router_node)
+    if runner.settings.SPECULATIVE_ROUTING_ENABLED:
+        workflow.add_node("router", runner.speculative_router_node)
+    else:
+        workflow.add_node("router", runner.router_node)
     workflow.add_node("analyzer", runner.analyze_case_node)
     workflow.add_node("framework_generator", runner.generate_reasoning_framework_node)
     workflow.add_node("keyword_extractor", runner.keyword_extraction_node)
@@ -30,15 +39,32 @@ def build_agent_graph(runner):
 
     workflow.set_entry_point("router")
 
-    workflow.add_conditional_edges(
-        "router",
-        decide_route,
-        {"analyzer": "analyzer", "simple_keyword_extractor": "simple_keyword_extractor"},
-    )
+    if parallel_case_analysis:
+        # Keywords from the raw query do not depend on the fact analysis, so a
+        # first retrieval pass runs alongside analyzer -> framework_generator and
+        # is joined with keyword_extractor at the retriever. Each parallel node is
+        # shorter than its sibling in the same step, keeping it off the critical path.
+        workflow.add_node("early_keyword_extractor", runner.simple_keyword_extractor_node)
+        workflow.add_node("early_retriever", runner.early_retrieval_node)
+        workflow.add_conditional_edges(
+            "router",
+            decide_route_parallel,
+            ["analyzer", "early_keyword_extractor", "simple_keyword_extractor"],
+        )
+        workflow.add_edge("early_keyword_extractor", "early_retriever")
+    else:
+        workflow.add_conditional_edges(
+            "router",
+            decide_route,
+            {"analyzer": "analyzer", "simple_keyword_extractor": "simple_keyword_extractor"},
+        )
 
     workflow.add_edge("analyzer", "framework_generator")
     workflow.add_edge("framework_generator", "keyword_extractor")
-    workflow.add_edge("keyword_extractor", "retriever")
+    if parallel_case_analysis:
+        workflow.add_edge(["keyword_extractor", "early_retriever"], "retriever")
+    else:
+        workflow.add_edge("keyword_extractor", "retriever")
     workflow.add_edge("simple_keyword_extractor", "retriever")
 
     workflow.add_conditional_edges(
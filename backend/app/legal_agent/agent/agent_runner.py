@@ -1,16 +1,34 @@
-import glob
+import asyncio
 import json
 import logging
-import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from uuid import uuid4
 
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableConfig
 from langfuse import Langfuse
 from langfuse.langchain import CallbackHandler
 
+from ...core.admission import AdmissionController
+from ...core.metrics import (
+    REQUEST_DURATION,
+    MetricsCallbackHandler,
+    register_embedding_cache,
+    sync_embedding_cache_metrics,
+)
 from ...core.settings import settings
+from ..tools.context_formatter import format_context_json
+from ..tools.document_scope import DocumentCatalog, load_partition_manifest
+from ..tools.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from ..tools.llm_gateway import LLMGateway
+from ..tools.reranker import Reranker
+from ..tools.semantic_cache import SemanticCache
+from ..tools.token_counter import count_tokens
+from ..tools.unit_store import (
+    UnitStore, article_id_of, build_unit_store, is_unit_store_stale
+)
 from ..tools.vector_retriever import VectorRetriever
 from .agent_graph import build_agent_graph
 from .prompt import (
@@ -18,17 +36,31 @@ from .prompt import (
     KeywordExtractionPrompt, ResponseGenerationPrompt, RouterPrompt,
     SimpleKeywordExtractionPrompt, SimpleRAGPrompt
 )
-from .state import AgentState
+from .state import AgentState, merge_hits
+from .streaming import coalesce_events
 
 logger = logging.getLogger(__name__)
 
+FINAL_NODES = {"responder", "simple_rag"}
+
+
+def coerce_keywords(value, fallback: list[str]) -> list[str]:
+    """Keep the non-empty strings of an LLM-emitted keyword list; a bare string counts as one keyword."""
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return fallback
+    keywords = [keyword.strip() for keyword in value if isinstance(keyword, str) and keyword.strip()]
+    return keywords or fallback
+
+
 @lru_cache(maxsize=1)
 def get_agent_runner():
     logger.info(f"Initializing or retrieving cached LegalAgentRunner.")
     return LegalAgentRunner(settings=settings)
 
 class LegalAgentRunner:
-    def __init__(self, settings):
+    def __init__(self, settings, llm=None, vector_retriever=None, unit_store=None):
         self.settings = settings
         if settings.LANGFUSE_SECRET_KEY and settings.LANGFUSE_PUBLIC_KEY:
             self.langfuse = Langfuse(
@@ -37,65 +69,159 @@ class LegalAgentRunner:
                 host=settings.LANGFUSE_HOST,
             )
 
-        self.llm = ChatOpenAI(
-            model=settings.LLM_MODEL_NAME,
-            openai_api_key=self.settings.OPENAI_API_KEY,
-            temperature=0,
-            streaming=True,
-        )
+        self.llm_gateway = LLMGateway(settings, llm=llm)
 
-        self.vector_retriever = VectorRetriever(settings)
-        self.units_map = self._preload_all_units(settings)
+        self.vector_retriever = vector_retriever or VectorRetriever(settings)
+        if settings.METRICS_ENABLED and getattr(self.vector_retriever, "embedding_cache", None) is not None:
+            register_embedding_cache(self.vector_retriever.embedding_cache)
+        self.retrieval_executor = ThreadPoolExecutor(
+            max_workers=settings.RETRIEVAL_MAX_WORKERS,
+            thread_name_prefix="retrieval",
+        )
+        self.admission = AdmissionController(settings)
+        self.semantic_cache = None
+        if settings.SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+                max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+                persist_path=settings.SEMANTIC_CACHE_PATH if settings.SEMANTIC_CACHE_PERSIST else None,
+                save_delay_seconds=settings.SEMANTIC_CACHE_SAVE_DELAY_SECONDS,
+            )
+            self.semantic_cache.check_fingerprint(self.vector_retriever.collection_fingerprint())
+        self.unit_store = unit_store or self._open_unit_store(settings)
+        self.reranker = None
+        if settings.RERANK_ENABLED:
+            self.reranker = Reranker(settings, device=getattr(self.vector_retriever, "device", "cpu"))
+        self.lexical_index = None
+        if settings.RETRIEVAL_MODE == "hybrid":
+            self.lexical_index = LexicalIndex(self.unit_store)
+        self.document_catalog = None
+        if settings.SCOPED_RETRIEVAL_ENABLED:
+            self.document_catalog = self._open_document_catalog(settings)
         self.app = build_agent_graph(self)
         logger.info("✅ LegalAgentRunner initialized successfully.")
 
-    def _preload_all_units(self, settings):
-        logger.info("Preloading all JSON data into memory...")
-        all_units = {}
-        folder_path = settings.PARSED_JSON_DIR
-        json_files = glob.glob(os.path.join(folder_path, "*.json"))
-        for filepath in json_files:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                doc_name = data.get("document", {}).get("name", "Unknown Document")
-                for unit in data.get("units", []):
-                    unit["document_name"] = doc_name
-                    all_units[unit["id"]] = unit
-        logger.info(f"✅ Preloaded {len(all_units)} units.")
-        return all_units
-
-    async def stream_run(self, query: str):
+    def _open_unit_store(self, settings):
+        if is_unit_store_stale(settings.PARSED_JSON_DIR, settings.UNIT_STORE_PATH):
+            logger.info("Unit store is missing or outdated, building it from parsed JSON...")
+            build_unit_store(settings.PARSED_JSON_DIR, settings.UNIT_STORE_PATH)
+        unit_store = UnitStore(settings.UNIT_STORE_PATH, cache_size=settings.UNIT_STORE_CACHE_SIZE)
+        logger.info(f"✅ Opened unit store at {settings.UNIT_STORE_PATH}.")
+        return unit_store
+
+    def _open_document_catalog(self, settings):
+        manifest = load_partition_manifest(settings, settings.CHROMA_COLLECTION_NAME)
+        if manifest:
+            return DocumentCatalog.from_manifest(manifest)
+        return DocumentCatalog.from_names(self.unit_store.document_names())
+
+    def warm_up(self):
+        logger.info("Running warm-up embedding and query...")
+        self.vector_retriever.warm_up()
+        if self.reranker is not None:
+            self.reranker.warm_up()
+        logger.info("✅ Warm-up completed.")
+
+    def _embed_for_cache(self, query: str):
+        self.semantic_cache.check_fingerprint(self.vector_retriever.collection_fingerprint())
+        return self.vector_retriever.embed([query])[0]
+
+    async def stream_run(self, query: str, callbacks: list = None):
+        callbacks = list(callbacks or [])
+        metrics_handler = None
+        if self.settings.METRICS_ENABLED:
+            metrics_handler = MetricsCallbackHandler(self.settings.LLM_MODEL_NAME)
+            callbacks.append(metrics_handler)
+
+        start_time = time.perf_counter()
+        outcome = "cancelled"
+        try:
+            query_embedding = None
+            if self.semantic_cache:
+                query_embedding = await self._run_retrieval(self._embed_for_cache, query)
+                cached_events = self.semantic_cache.lookup(query_embedding)
+                if cached_events is not None:
+                    for event in cached_events:
+                        yield event
+                    outcome = "cached"
+                    return
+
+            recorded_events = []
+            async for event in self._stream_graph(query, callbacks):
+                if self.semantic_cache:
+                    recorded_events.append(event)
+                yield event
+            outcome = "completed"
+
+            if self.semantic_cache:
+                self.semantic_cache.store(query, query_embedding, recorded_events)
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            if metrics_handler is not None:
+                REQUEST_DURATION.labels(metrics_handler.route, outcome).observe(time.perf_counter() - start_time)
+                sync_embedding_cache_metrics()
+                if outcome == "cancelled":
+                    report = metrics_handler.record_cancellation()
+                    logger.warning(f"Agent run cancelled after {time.perf_counter() - start_time:.2f}s: {report}")
+
+    async def _stream_graph(self, query: str, callbacks: list = None):
         session_id = str(uuid4())
         initial_state = {"original_query": query}
         
-        callbacks = []
+        callbacks = list(callbacks or [])
         if hasattr(self, 'langfuse'):
             langfuse_handler = CallbackHandler()
             callbacks.append(langfuse_handler)
 
-        config = {"configurable": {"thread_id": session_id}, "callbacks": callbacks}
-
-        async for event in self.app.astream_events(initial_state, config=config, version="v1"):
-            kind = event["event"]
-            
-            if kind == "on_chain_end":
-                node_name = event["name"]
-                if node_name not in ["LangGraph", "responder", "simple_rag"]:
-                    yield {
-                        "type": "node_result",
-                        "node_name": node_name,
-                        "data": event["data"].get("output"),
-                    }
-            
-            if kind == "on_chat_model_stream":
-                if "final_answer" in event["tags"]:
-                    content = event["data"]["chunk"].content
-                    if content:
-                        yield {"type": "final_chunk", "data": content}
-
-    def router_node(self, state: AgentState) -> dict:
+        # Bounded, so a slow client throttles the final node instead of buffering its tokens.
+        events = asyncio.Queue(maxsize=self.settings.STREAM_QUEUE_SIZE)
+        config = {
+            "configurable": {"thread_id": session_id, "token_sink": events},
+            "callbacks": callbacks,
+        }
+        graph_task = asyncio.create_task(self._run_graph(initial_state, config, events))
+        try:
+            async for event in coalesce_events(
+                events, self.settings.STREAM_COALESCE_MS / 1000, self.settings.STREAM_COALESCE_CHARS
+            ):
+                yield event
+            await graph_task
+        finally:
+            graph_task.cancel()
+
+    async def _run_graph(self, initial_state: dict, config: dict, events: asyncio.Queue):
+        """Feed end-of-node summaries into ``events``; final nodes stream their tokens there themselves."""
+        try:
+            async for update in self.app.astream(initial_state, config=config, stream_mode="updates"):
+                for node_name, output in update.items():
+                    if node_name not in FINAL_NODES:
+                        if output and "speculative_result" in output:
+                            # Internal hand-off to the next nodes; the retrieved context is
+                            # too large for the router's summary event and the cached replay.
+                            output = {k: v for k, v in output.items() if k != "speculative_result"}
+                        await events.put(("node", node_name, output))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await events.put(None)
+            raise
+        await events.put(None)
+
+    async def _invoke_llm(self, node: str, prompt: str, token_sink: asyncio.Queue = None):
+        async with self.admission.llm.slot():
+            return await self.llm_gateway.ainvoke(node, prompt, token_sink=token_sink)
+
+    async def _run_retrieval(self, fn, *args):
+        async with self.admission.retrieval.slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.retrieval_executor, fn, *args)
+
+    async def router_node(self, state: AgentState) -> dict:
         prompt = RouterPrompt.format(query=state["original_query"])
-        response = self.llm.invoke(prompt)
+        response = await self._invoke_llm("router", prompt)
         route = response.content.strip().lower()
         if "case_analysis" in route:
             route = "case_analysis"
@@ -104,91 +230,285 @@ class LegalAgentRunner:
 
         return {"route_decision": route}
 
-    def simple_keyword_extractor_node(self, state: AgentState) -> dict:
-        prompt = SimpleKeywordExtractionPrompt.format(query=state["original_query"])
-        response_text = self.llm.invoke(prompt).content
+    async def _speculative_simple_branch(self, state: AgentState):
+        start_time = time.perf_counter()
+        extraction = await self._extract_simple_keywords(state)
+        retrieval = await self.information_retrieval_node({**state, **extraction})
+        return extraction, retrieval, time.perf_counter() - start_time
+
+    async def speculative_router_node(self, state: AgentState) -> dict:
+        start_time = time.perf_counter()
+        simple_branch = asyncio.create_task(self._speculative_simple_branch(state))
+        try:
+            decision = await self.router_node(state)
+        except BaseException:
+            simple_branch.cancel()
+            raise
+        router_seconds = time.perf_counter() - start_time
+
+        if decision["route_decision"] != "simple_rag":
+            simple_branch.cancel()
+            logger.info("Router chose case_analysis, discarded the speculative simple_rag branch.")
+            return decision
+
+        extraction, retrieval, branch_seconds = await simple_branch
+        time_saved = router_seconds + branch_seconds - (time.perf_counter() - start_time)
+        logger.info(f"Speculative routing saved {time_saved * 1000:.0f} ms on the simple_rag path.")
+        return {
+            **decision,
+            "speculative_result": {
+                **extraction,
+                **retrieval,
+                "time_saved_ms": round(time_saved * 1000),
+            },
+        }
+
+    async def simple_keyword_extractor_node(self, state: AgentState) -> dict:
+        speculative_result = state.get("speculative_result")
+        if speculative_result:
+            return {
+                key: speculative_result[key]
+                for key in ("extracted_keywords", "retrieval_scope")
+                if key in speculative_result
+            }
+        return await self._extract_simple_keywords(state)
+
+    def _parse_keyword_response(self, response_text: str, fallback: list[str]) -> dict:
+        """Keywords and the resolved ``retrieval_scope`` (``None`` when the model named none).
+
+        Accepts a plain JSON list or ``{"keywords": [...], "scope": {...}}``. The
+        scope is always written so a later extractor clears an earlier one.
+        """
         try:
             match = re.search(r"```json\s*([\s\S]*?)\s*```", response_text)
             json_str = match.group(1) if match else response_text
-            keywords = json.loads(json_str)
+            parsed = json.loads(json_str)
         except (json.JSONDecodeError, AttributeError):
-            keywords = [state["original_query"]]
-        return {"extracted_keywords": keywords}
+            return {"extracted_keywords": fallback, "retrieval_scope": None}
+        if not isinstance(parsed, dict):
+            return {"extracted_keywords": coerce_keywords(parsed, fallback), "retrieval_scope": None}
+
+        update = {"extracted_keywords": coerce_keywords(parsed.get("keywords"), fallback), "retrieval_scope": None}
+        if self.document_catalog is not None:
+            filters = self.document_catalog.resolve(
+                parsed.get("scope"), self.settings.RETRIEVAL_SCOPE_MAX_DOCUMENTS
+            )
+            if filters:
+                logger.info(f"Retrieval scoped to {filters}.")
+                update["retrieval_scope"] = filters
+        return update
 
-    def analyze_case_node(self, state: AgentState) -> dict:
+    async def _extract_simple_keywords(self, state: AgentState) -> dict:
+        prompt = SimpleKeywordExtractionPrompt.format(query=state["original_query"])
+        response_text = (await self._invoke_llm("simple_keyword_extractor", prompt)).content
+        return self._parse_keyword_response(response_text, [state["original_query"]])
+
+    async def analyze_case_node(self, state: AgentState) -> dict:
         prompt = FactAnalysisPrompt.format(query=state["original_query"])
-        response = self.llm.invoke(prompt)
+        response = await self._invoke_llm("analyzer", prompt)
         return {"fact_analysis": response.content}
 
-    def generate_reasoning_framework_node(self, state: AgentState) -> dict:
+    async def generate_reasoning_framework_node(self, state: AgentState) -> dict:
         prompt = FrameworkGenerationPrompt.format(fact_analysis=state["fact_analysis"])
-        response = self.llm.invoke(prompt)
+        response = await self._invoke_llm("framework_generator", prompt)
         return {"reasoning_framework": response.content}
 
-    def keyword_extraction_node(self, state: AgentState) -> dict:
+    async def keyword_extraction_node(self, state: AgentState) -> dict:
         prompt = KeywordExtractionPrompt.format(
             fact_analysis=state["fact_analysis"],
             reasoning_framework=state["reasoning_framework"],
         )
-        response_text = self.llm.invoke(prompt).content
-        try:
-            match = re.search(r"```json\s*([\s\S]*?)\s*```", response_text)
-            json_str = match.group(1) if match else response_text
-            keywords = json.loads(json_str)
-        except (json.JSONDecodeError, AttributeError):
-            keywords = []
-        return {"extracted_keywords": keywords}
+        response_text = (await self._invoke_llm("keyword_extractor", prompt)).content
+        return self._parse_keyword_response(response_text, [])
+
+    def _hydrate_parent_articles(self, sorted_hits: list[dict]) -> list[dict]:
+        token_budget = self.settings.CONTEXT_TOKEN_BUDGET
+        used_tokens = 0
+        hydrated_units = []
+        included_ids = set()
+        hydrated_articles = set()
+
+        def try_add(units: list[dict]) -> bool:
+            nonlocal used_tokens
+            units = [u for u in units if u["id"] not in included_ids]
+            cost = sum(
+                count_tokens(json.dumps(u, ensure_ascii=False), self.settings.LLM_MODEL_NAME)
+                for u in units
+            )
+            if used_tokens + cost > token_budget:
+                return False
+            used_tokens += cost
+            hydrated_units.extend(units)
+            included_ids.update(u["id"] for u in units)
+            return True
+
+        for hit in sorted_hits:
+            if hit["id"] in included_ids:
+                continue
+            article_id = article_id_of(hit["id"])
+            if article_id and article_id not in hydrated_articles:
+                hydrated_articles.add(article_id)
+                article_units = [
+                    {
+                        "id": unit["id"],
+                        "document_name": unit.get("document_name"),
+                        "content": unit.get("content"),
+                        "context": unit.get("context"),
+                    }
+                    for unit in self.unit_store.get_article_units(article_id)
+                ]
+                if article_units and try_add(article_units):
+                    continue
+            try_add([hit])
+
+        logger.info(
+            f"Hydrated {len(hydrated_articles)} parent articles into {len(hydrated_units)} units "
+            f"(~{used_tokens}/{token_budget} tokens)."
+        )
+        return hydrated_units
+
+    def _search_many(self, queries: list[str], n_results: int, filters: dict = None) -> list[dict]:
+        hits = self._search_scoped(queries, n_results, filters)
+        if filters and filters.get("chapters") and not hits:
+            # Chapters are often misnumbered, or missing from older collections; keep the documents.
+            filters = {key: value for key, value in filters.items() if key != "chapters"}
+            logger.info(f"No hits within the requested chapters, searching {filters}.")
+            hits = self._search_scoped(queries, n_results, filters)
+        if filters and not hits:
+            # A scope the model got wrong must not leave the answer without context.
+            logger.info(f"No hits within {filters}, searching all documents.")
+            hits = self._search_scoped(queries, n_results, None)
+        return hits
+
+    def _search_scoped(self, queries: list[str], n_results: int, filters: dict = None) -> list[dict]:
+        if self.lexical_index is None:
+            return self.vector_retriever.search_many(queries, n_results, filters=filters)
 
-    def information_retrieval_node(self, state: AgentState) -> dict:
+        # Exact citations ("Điều 651 Bộ luật Dân sự") resolve from the index
+        # directly and skip the embedding pass.
+        document_names = (filters or {}).get("document_names")
+        citation_hits = []
+        open_queries = []
+        for query in queries:
+            hits = self.lexical_index.lookup_citation(query, n_results, document_names)
+            if hits:
+                citation_hits.extend(hits)
+            else:
+                open_queries.append(query)
+
+        dense_hits = []
+        lexical_hits = []
+        if open_queries:
+            dense_hits = self.vector_retriever.search_many(open_queries, n_results, filters=filters)
+            lexical_hits = self.lexical_index.search_many(open_queries, n_results, document_names=document_names)
+        # Citation hits lead the lexical ranking and are scored by fusion like any other hit.
+        lexical_ranking = {}
+        for hit in citation_hits + lexical_hits:
+            lexical_ranking.setdefault(hit["id"], hit)
+        return reciprocal_rank_fusion(
+            [dense_hits, list(lexical_ranking.values())], k=self.settings.RRF_K
+        )[: n_results * len(queries)]
+
+    def _results_per_keyword(self, n_keywords: int) -> int:
+        if self.reranker is None or not n_keywords:
+            return 3
+        return max(3, -(-self.settings.RERANK_CANDIDATES // n_keywords))
+
+    def _build_context_units(self, query: str, sorted_hits: list[dict]):
+        timings = {}
+        if self.reranker is not None:
+            start_time = time.perf_counter()
+            candidates = sorted_hits[: self.settings.RERANK_CANDIDATES]
+            sorted_hits, reranked = self.reranker.rerank(query, candidates, self.settings.RERANK_TOP_K)
+            timings["rerank_ms" if reranked else "rerank_skipped_ms"] = round(
+                (time.perf_counter() - start_time) * 1000, 1
+            )
+
+        if self.settings.CONTEXT_HYDRATION_ENABLED:
+            start_time = time.perf_counter()
+            sorted_hits = self._hydrate_parent_articles(sorted_hits)
+            timings["hydration_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+        return sorted_hits, timings
+
+    async def early_retrieval_node(self, state: AgentState) -> dict:
         keywords = state.get("extracted_keywords", [])
-        if not keywords: return {"retrieved_context": "[]"}
-        
-        unique_hits = {}
-        for k in keywords:
-            search_results = self.vector_retriever.search(k, n_results=3)
-            for hit in search_results:
-                if hit['id'] not in unique_hits:
-                    unique_hits[hit['id']] = hit
+        if not keywords: return {}
+        scope = state.get("retrieval_scope")
+        hits = await self._run_retrieval(self._search_many, keywords, self._results_per_keyword(len(keywords)), scope)
+        return {"searched_keywords": keywords, "searched_scope": scope, "retrieved_hits": hits}
 
-        sorted_hits = sorted(unique_hits.values(), key=lambda x: x['similarity'], reverse=True)
+    async def information_retrieval_node(self, state: AgentState) -> dict:
+        speculative_result = state.get("speculative_result")
+        if speculative_result:
+            return {
+                key: speculative_result[key]
+                for key in ("retrieved_context", "retrieval_timings")
+                if key in speculative_result
+            }
 
-        context_json_str = json.dumps(sorted_hits, indent=2, ensure_ascii=False)
-        
-        # parent_article_ids = set()
-        # for hit in sorted_hits:
-        #       match = re.search(r"(_điều-[\w.-]+)", hit["id"])
-        #       if match:
-        #           parent_article_ids.add(hit["id"][: match.end()])
-        # # print("----------------------------------------------------------------------------------------------len(parent_article_ids): ",len(parent_article_ids), parent_article_ids)
-        # hydrated_context_units = []
-        # retrieved_ids = set()
-        # for article_id in parent_article_ids:
-        #     for unit_id, unit_data in self.units_map.items():
-        #         if unit_id.startswith(article_id) and unit_id not in retrieved_ids:
-        #             hydrated_context_units.append(unit_data)
-        #             retrieved_ids.add(unit_id)
-        # # print("----------------------------------------------------------------------------------------------len(hydrated_context_units): ",len(hydrated_context_units), hydrated_context_units)
-        # context_json_str = json.dumps(hydrated_context_units, indent=2, ensure_ascii=False)
-        return {"retrieved_context": context_json_str}
-
-    def final_reasoning_node(self, state: AgentState) -> dict:
+        keywords = state.get("extracted_keywords", [])
+        scope = state.get("retrieval_scope")
+        early_hits = state.get("retrieved_hits")
+        searched_keywords = set(state.get("searched_keywords") or [])
+        if early_hits is not None and state.get("searched_scope") != scope:
+            # The early search ran under a scope the full extraction replaced.
+            early_hits, searched_keywords = None, set()
+        pending_keywords = [k for k in keywords if k not in searched_keywords]
+
+        timings = {}
+        new_hits = []
+        if pending_keywords:
+            start_time = time.perf_counter()
+            new_hits = await self._run_retrieval(
+                self._search_many,
+                pending_keywords,
+                self._results_per_keyword(len(keywords)),
+                scope,
+            )
+            timings["search_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+        sorted_hits = merge_hits(early_hits, new_hits)
+        if not sorted_hits: return {"retrieved_context": "[]"}
+
+        context_units, stage_timings = await self._run_retrieval(
+            self._build_context_units, state["original_query"], sorted_hits
+        )
+        timings.update(stage_timings)
+        timings["units"] = len(context_units)
+        logger.info(f"Retrieval stage timings: {timings}")
+
+        context_json_str = json.dumps(context_units, ensure_ascii=False)
+        return {"retrieved_context": context_json_str, "retrieval_timings": timings}
+
+    def _prompt_context(self, state: AgentState, token_budget: int) -> str:
+        return format_context_json(
+            state.get("retrieved_context", "[]"), token_budget, self.settings.LLM_MODEL_NAME
+        )
+
+    async def final_reasoning_node(self, state: AgentState) -> dict:
         prompt = FinalReasoningPrompt.format(
             reasoning_framework=state["reasoning_framework"],
-            context=state["retrieved_context"],
+            context=self._prompt_context(state, self.settings.REASONING_CONTEXT_TOKEN_BUDGET),
         )
-        response = self.llm.invoke(prompt)
+        response = await self._invoke_llm("reasoner", prompt)
         return {"final_analysis": response.content}
 
-    def response_generation_node(self, state: AgentState) -> dict:
+    async def response_generation_node(self, state: AgentState, config: RunnableConfig) -> dict:
         prompt = ResponseGenerationPrompt.format(
             query=state["original_query"],
             final_analysis=state["final_analysis"],
-            retrieved_context=state["retrieved_context"],
+            retrieved_context=self._prompt_context(state, self.settings.RESPONSE_CONTEXT_TOKEN_BUDGET),
+        )
+        response = await self._invoke_llm(
+            "responder", prompt, token_sink=config["configurable"].get("token_sink")
         )
-        response = self.llm.with_config(tags=["final_answer"]).invoke(prompt)
         return {"final_response": response.content}
 
-    def simple_rag_node(self, state: AgentState) -> dict:
-        prompt = SimpleRAGPrompt.format(context=state["retrieved_context"], query=state["original_query"])
-        response = self.llm.with_config(tags=["final_answer"]).invoke(prompt)
+    async def simple_rag_node(self, state: AgentState, config: RunnableConfig) -> dict:
+        prompt = SimpleRAGPrompt.format(
+            context=self._prompt_context(state, self.settings.SIMPLE_RAG_CONTEXT_TOKEN_BUDGET),
+            query=state["original_query"],
+        )
+        response = await self._invoke_llm(
+            "simple_rag", prompt, token_sink=config["configurable"].get("token_sink")
+        )
         return {"final_response": response.content}
\ No newline at end of file
@@ -17,20 +17,30 @@ RouterPrompt = PromptTemplate.from_template(ROUTER_PROMPT)
 
 SIMPLE_KEYWORD_EXTRACTION_PROMPT = """
 Bạn là một AI trợ lý pháp lý. Từ câu hỏi của người dùng dưới đây, hãy trích xuất các thuật ngữ pháp lý hoặc các khái niệm cốt lõi nhất để phục vụ cho việc tra cứu. Chỉ tập trung vào các danh từ và cụm danh từ chính.
-Trả về kết quả dưới dạng một danh sách JSON của các chuỗi.
+Nếu câu hỏi nêu rõ văn bản pháp luật (ví dụ: "Bộ luật Lao động") hoặc chắc chắn thuộc một lĩnh vực cụ thể (ví dụ: "đất đai", "hôn nhân và gia đình"), hãy thêm phạm vi tra cứu "scope"; nếu không chắc chắn, đặt "scope" là null.
+Trong "scope", nếu câu hỏi nêu rõ chương (ví dụ: "Chương III") hãy thêm "chapters" (danh sách số chương, ví dụ ["III"]); nếu câu hỏi hỏi về quy định có hiệu lực tại một thời điểm cụ thể hãy thêm "effective_on" (ngày dạng "YYYY-MM-DD").
+Trả về kết quả dưới dạng một đối tượng JSON có khóa "keywords" (danh sách các chuỗi) và "scope".
 
 Ví dụ 1:
 Câu hỏi: "Giao dịch dân sự vô hiệu là gì?"
-Kết quả: ["giao dịch dân sự vô hiệu"]
+Kết quả: {{"keywords": ["giao dịch dân sự vô hiệu"], "scope": {{"documents": ["Bộ luật Dân sự"], "topics": []}}}}
 
 Ví dụ 2:
 Câu hỏi: "Thời hiệu khởi kiện đòi lại tài sản là bao lâu?"
-Kết quả: ["thời hiệu khởi kiện", "đòi lại tài sản"]
+Kết quả: {{"keywords": ["thời hiệu khởi kiện", "đòi lại tài sản"], "scope": null}}
+
+Ví dụ 3:
+Câu hỏi: "Người lao động nghỉ việc được trợ cấp thôi việc thế nào?"
+Kết quả: {{"keywords": ["trợ cấp thôi việc", "chấm dứt hợp đồng lao động"], "scope": {{"documents": [], "topics": ["lao động"]}}}}
+
+Ví dụ 4:
+Câu hỏi: "Theo Chương III Bộ luật Lao động đang có hiệu lực ngày 01/01/2021, hợp đồng lao động có những loại nào?"
+Kết quả: {{"keywords": ["loại hợp đồng lao động"], "scope": {{"documents": ["Bộ luật Lao động"], "topics": [], "chapters": ["III"], "effective_on": "2021-01-01"}}}}
 
 Câu hỏi của người dùng:
 {query}
 
-Danh sách JSON các từ khóa:
+Đối tượng JSON:
 """
 SimpleKeywordExtractionPrompt = PromptTemplate.from_template(
     SIMPLE_KEYWORD_EXTRACTION_PROMPT
@@ -81,9 +91,11 @@ Bạn là một AI chuyên gia về pháp luật Việt Nam. Nhiệm vụ của
 -   **Lĩnh vực luật** được nhắc đến hoặc liên quan đến vấn đề.
 -   **Các khái niệm hoặc đối tượng quan trọng** trong vụ việc (ví dụ: "quyền sử dụng đất", "xe ô tô", "quyết định hành chính").
 **LƯU Ý:** Chỉ trích xuất các thuật ngữ **thực sự xuất hiện hoặc có liên quan trực tiếp** trong tài liệu được cung cấp. Không suy diễn ra các thuật ngữ không có.
-Hãy trả về kết quả dưới dạng một danh sách JSON của các chuỗi.
+Nếu khung sườn suy luận chỉ ra cụ thể (các) văn bản pháp luật điều chỉnh vụ việc, hãy thêm phạm vi tra cứu "scope" gồm tên các văn bản đó ("documents") và/hoặc lĩnh vực ("topics"); nếu vụ việc liên quan đến nhiều lĩnh vực hoặc không chắc chắn, đặt "scope" là null.
+Nếu tài liệu chỉ ra chương cụ thể, thêm "chapters" (ví dụ ["III"]); nếu vụ việc xảy ra tại một thời điểm xác định, thêm "effective_on" (ngày dạng "YYYY-MM-DD") để tra cứu văn bản có hiệu lực vào thời điểm đó.
+Hãy trả về kết quả dưới dạng một đối tượng JSON có khóa "keywords" (danh sách các chuỗi) và "scope".
 **Ví dụ định dạng đầu ra:**
-["hợp đồng vô hiệu", "thừa kế theo pháp luật", "quyền sử dụng đất của hộ gia đình", "Luật đất đai", "Luật Dân sự"]
+{{"keywords": ["hợp đồng vô hiệu", "thừa kế theo pháp luật", "quyền sử dụng đất của hộ gia đình", "Luật đất đai", "Luật Dân sự"], "scope": {{"documents": ["Bộ luật Dân sự", "Luật Đất đai"], "topics": []}}}}
 Bây giờ, hãy thực hiện trích xuất từ tài liệu đã cho.
 """
 KeywordExtractionPrompt = PromptTemplate.from_template(KEYWORD_EXTRACTION_PROMPT)
@@ -93,18 +105,19 @@ FINAL_REASONING_PROMPT = """
 Bạn là một Thẩm phán AI cực kỳ cẩn trọng và chính xác. Nhiệm vụ của bạn là viết một bài phân tích pháp lý chỉ dựa trên các bằng chứng được cung cấp.
 
 **QUY TẮC VÀNG (BẮT BUỘC TUÂN THỦ):**
-1.  **CHỈ SỬ DỤNG NGUỒN ĐÃ CHO:** Toàn bộ bài phân tích của bạn phải dựa trên các nguyên tắc pháp lý rút ra từ `CÁC QUY ĐỊNH PHÁP LUẬT` trong `{context}`.
-2.  **NGHIÊM CẤM DÙNG KIẾN THỨC NGOÀI:** Không được tự ý trích dẫn hay đề cập đến bất kỳ số hiệu điều luật, nghị định, hay thông tư nào nếu nó không được ghi rõ trong `{context}`.
-3.  **TRÍCH DẪN TẠI CHỖ (MUST-CITE):** Với MỖI luận điểm pháp lý bạn đưa ra, bạn **BẮT BUỘC** phải tìm (các) `unit` liên quan nhất trong `{context}` để chứng minh cho luận điểm đó. Sau đó, **đặt ID và Tên văn bản của (các) `unit` đó vào cuối câu** theo định dạng sau:
+1.  **CHỈ SỬ DỤNG NGUỒN ĐÃ CHO:** Toàn bộ bài phân tích của bạn phải dựa trên các nguyên tắc pháp lý rút ra từ mục `CÁC QUY ĐỊNH PHÁP LUẬT` bên dưới.
+2.  **NGHIÊM CẤM DÙNG KIẾN THỨC NGOÀI:** Không được tự ý trích dẫn hay đề cập đến bất kỳ số hiệu điều luật, nghị định, hay thông tư nào nếu nó không được ghi rõ trong mục `CÁC QUY ĐỊNH PHÁP LUẬT`.
+3.  **TRÍCH DẪN TẠI CHỖ (MUST-CITE):** Với MỖI luận điểm pháp lý bạn đưa ra, bạn **BẮT BUỘC** phải tìm (các) `unit` liên quan nhất trong mục `CÁC QUY ĐỊNH PHÁP LUẬT` để chứng minh cho luận điểm đó. Sau đó, **đặt ID và Tên văn bản của (các) `unit` đó vào cuối câu** theo định dạng sau:
     - Nếu có một nguồn: `(Dựa trên: [id_của_unit, document_name_của_unit])`
     - Nếu có nhiều nguồn: `(Dựa trên các: [id_1, document_name_1], [id_2, document_name_2], ...)`
-4.  **KHI KHÔNG CÓ NGUỒN:** Nếu không có `unit` nào trong `{context}` hỗ trợ cho một luận điểm trong `KHUNG SƯỜN SUY LUẬN`, bạn phải ghi rõ: **"Không có thông tin pháp lý được cung cấp để phân tích vấn đề này."** và không phân tích thêm.
+4.  **KHI KHÔNG CÓ NGUỒN:** Nếu không có `unit` nào trong mục `CÁC QUY ĐỊNH PHÁP LUẬT` hỗ trợ cho một luận điểm trong `KHUNG SƯỜN SUY LUẬN`, bạn phải ghi rõ: **"Không có thông tin pháp lý được cung cấp để phân tích vấn đề này."** và không phân tích thêm.
 
 **ĐẦU VÀO:**
 **1. KHUNG SƯỜN SUY LUẬN CẦN TUÂN THỦ:**
 {reasoning_framework}
 
 **2. CÁC QUY ĐỊNH PHÁP LUẬT LIÊN QUAN ĐÃ TRUY VẤN (Bằng chứng duy nhất):**
+(Các `unit` được nhóm theo tiêu đề `### Tên văn bản`; mỗi `unit` bắt đầu bằng `[id]`, theo sau là tên điều luật và nội dung.)
 {context}
 
 **NHIỆM VỤ:**
@@ -136,10 +149,10 @@ Thực hiện một quy trình máy móc và chính xác như sau:
 **YÊU CẦU BẮT BUỘC VỀ ĐỊNH DẠNG TRÍCH DẪN:**
 Mỗi trích dẫn phải theo đúng định dạng Markdown Blockquote sau:
 ```markdown
-> **id:** [Lấy từ trường 'id' trong JSON nguồn]
-> **Văn bản:** [Lấy từ trường 'document_name' trong JSON nguồn]
-> **Bối cảnh/Tên điều luật:** [Lấy từ trường 'context' trong JSON nguồn]
-> **Nội dung:** [Lấy từ trường 'content' trong JSON nguồn]
+> **id:** [Lấy từ `[id]` của unit trong nguồn]
+> **Văn bản:** [Lấy từ tiêu đề `### Tên văn bản` chứa unit đó]
+> **Bối cảnh/Tên điều luật:** [Lấy từ phần ghi sau `[id]`, hoặc của unit gần nhất phía trên trong cùng văn bản nếu bị lược bỏ]
+> **Nội dung:** [Lấy từ các dòng nội dung ngay dưới `[id]`]
 Bây giờ, hãy bắt đầu biên tập lại bài phân tích thành một câu trả lời hoàn chỉnh và chuyên nghiệp.
 """
 ResponseGenerationPrompt = PromptTemplate.from_template(RESPONSE_GENERATION_PROMPT)
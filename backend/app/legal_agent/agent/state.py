@@ -1,11 +1,40 @@
-from typing import List, TypedDict
+from typing import Annotated, List, Optional, TypedDict
+
+
+def _keyword_list(value) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, (list, tuple)):
+        return []
+    # Anything else a model emitted (numbers, nested lists, objects) is not a keyword.
+    return [item for item in value if isinstance(item, str)]
+
+
+def merge_keywords(existing: Optional[List[str]], new: Optional[List[str]]) -> List[str]:
+    return list(dict.fromkeys(_keyword_list(existing) + _keyword_list(new)))
+
+
+def merge_hits(existing: Optional[List[dict]], new: Optional[List[dict]]) -> List[dict]:
+    unique_hits = {}
+    for hit in (existing or []) + (new or []):
+        current = unique_hits.get(hit["id"])
+        if current is None or hit["similarity"] > current["similarity"]:
+            unique_hits[hit["id"]] = hit
+    return sorted(unique_hits.values(), key=lambda x: x["similarity"], reverse=True)
+
 
 class AgentState(TypedDict):
     original_query: str
     route_decision: str
+    speculative_result: Optional[dict]
     fact_analysis: str
     reasoning_framework: str
-    extracted_keywords: List[str]
+    extracted_keywords: Annotated[List[str], merge_keywords]
+    retrieval_scope: Optional[dict]
+    searched_keywords: Annotated[List[str], merge_keywords]
+    searched_scope: Optional[dict]
+    retrieved_hits: Annotated[List[dict], merge_hits]
     retrieved_context: str
+    retrieval_timings: Optional[dict]
     final_analysis: str
     final_response: str
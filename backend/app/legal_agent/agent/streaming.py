@@ -0,0 +1,48 @@
+import asyncio
+
+
+async def coalesce_events(queue: asyncio.Queue, window_seconds: float, max_chars: int):
+    """Turn queued graph items into client events, batching final-answer tokens into frames.
+
+    Items are ``("node", name, output)``, ``("token", text)`` or ``None`` (end of run).
+    Tokens are flushed as one ``final_chunk`` once ``max_chars`` are buffered or
+    ``window_seconds`` have passed since the first buffered token, whichever is first.
+    """
+    loop = asyncio.get_running_loop()
+    buffer = []
+    buffered_chars = 0
+    flush_at = None
+    # A single pending get() survives timeouts, so no item is lost when the window expires.
+    get_task = None
+    try:
+        while True:
+            if get_task is None:
+                get_task = asyncio.ensure_future(queue.get())
+            timeout = None if flush_at is None else max(0.0, flush_at - loop.time())
+            done, _ = await asyncio.wait({get_task}, timeout=timeout)
+
+            item = None
+            if done:
+                item = get_task.result()
+                get_task = None
+                if item is not None and item[0] == "token":
+                    buffer.append(item[1])
+                    buffered_chars += len(item[1])
+                    if flush_at is None:
+                        flush_at = loop.time() + window_seconds
+                    if buffered_chars < max_chars:
+                        continue
+
+            if buffer:
+                yield {"type": "final_chunk", "data": "".join(buffer)}
+                buffer = []
+                buffered_chars = 0
+                flush_at = None
+
+            if done and item is None:
+                return
+            if item is not None and item[0] == "node":
+                yield {"type": "node_result", "node_name": item[1], "data": item[2]}
+    finally:
+        if get_task is not None:
+            get_task.cancel()
@@ -0,0 +1,63 @@
+import json
+import logging
+
+from .token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def _render_unit(unit: dict, previous_context) -> str:
+    lines = [f"[{unit['id']}]"]
+    context = unit.get("context")
+    if context and context != previous_context:
+        lines[0] += f" {context}"
+    content = unit.get("content")
+    if content:
+        lines.append(content.strip())
+    return "\n".join(lines)
+
+
+def format_context(units: list[dict], token_budget: int = None, model_name: str = "gpt-4o-mini") -> str:
+    """Render retrieved units as a compact, citation-preserving text block.
+
+    Units are kept in relevance order until ``token_budget`` is reached, then
+    grouped under one heading per document. Each unit keeps its id, and its
+    context line is only repeated when it differs from the previous unit of the
+    same document. Similarity scores and repeated document names are dropped.
+    """
+    if not units:
+        return "(Không có thông tin pháp lý nào được tìm thấy.)"
+
+    selected = []
+    used_tokens = 0
+    for unit in units:
+        cost = count_tokens(_render_unit(unit, None), model_name) + 2
+        if token_budget is not None and used_tokens + cost > token_budget:
+            continue
+        selected.append(unit)
+        used_tokens += cost
+
+    if len(selected) < len(units):
+        logger.info(f"Context budget of {token_budget} tokens kept {len(selected)}/{len(units)} units.")
+
+    documents = {}
+    for unit in selected:
+        documents.setdefault(unit.get("document_name") or "Không rõ văn bản", []).append(unit)
+
+    blocks = []
+    for document_name, document_units in documents.items():
+        rendered = [f"### {document_name}"]
+        previous_context = None
+        for unit in document_units:
+            rendered.append(_render_unit(unit, previous_context))
+            previous_context = unit.get("context") or previous_context
+        blocks.append("\n".join(rendered))
+    return "\n\n".join(blocks)
+
+
+def format_context_json(context_json: str, token_budget: int = None, model_name: str = "gpt-4o-mini") -> str:
+    try:
+        units = json.loads(context_json) if context_json else []
+    except json.JSONDecodeError:
+        return context_json
+    return format_context(units, token_budget, model_name)
@@ -0,0 +1,279 @@
+"""Document-scoped retrieval: per-document Chroma partitions and scope resolution.
+
+Usage (from the ``backend`` directory):
+
+    python -m app.legal_agent.tools.document_scope            # (re)build every partition
+    python -m app.legal_agent.tools.document_scope --documents "Bộ luật Lao động"
+
+Each parsed document gets its own small collection holding a copy of its units'
+stored embeddings (nothing is re-embedded), with filter metadata (``topic``,
+``chapter``, ``effective_date``) taken from the parsed JSON. A manifest in
+``CHROMA_PERSIST_PATH/partitions.json`` records the partitions per collection
+and the index version they were built from; the retriever only uses them while
+that version is current.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import date
+
+from .lexical_index import normalize
+
+logger = logging.getLogger(__name__)
+
+CHAPTER_PATTERN = re.compile(r"\bChương\s+([IVXLCDM]+|\d+)\b", re.IGNORECASE)
+DATE_PATTERN = re.compile(r"(\d{4})(?:[-/.](\d{1,2})(?:[-/.](\d{1,2}))?)?")
+
+
+def partition_collection_name(collection_name: str, document_name: str) -> str:
+    digest = hashlib.sha1(document_name.encode("utf-8")).hexdigest()[:12]
+    return f"{collection_name}__doc_{digest}"
+
+
+def parse_date(value):
+    """Parse ``YYYY``, ``YYYY-MM`` or ``YYYY-MM-DD`` (also ``DD/MM/YYYY``) into an int ``YYYYMMDD``."""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    day_first = re.fullmatch(r"(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})", text)
+    if day_first:
+        day, month, year = (int(part) for part in day_first.groups())
+    else:
+        match = DATE_PATTERN.search(text)
+        if not match:
+            return None
+        year, month, day = int(match.group(1)), int(match.group(2) or 1), int(match.group(3) or 1)
+    try:
+        return int(date(year, month, day).strftime("%Y%m%d"))
+    except ValueError:
+        return None
+
+
+def unit_filter_metadata(document: dict, unit: dict) -> dict:
+    """Filter fields stored on partitioned units; absent fields are left out (Chroma rejects None)."""
+    metadata = {}
+    if document.get("topic"):
+        metadata["topic"] = document["topic"]
+    chapter = unit.get("chapter")
+    if not chapter:
+        match = CHAPTER_PATTERN.search(unit.get("context") or "")
+        chapter = match.group(1).upper() if match else None
+    if chapter:
+        metadata["chapter"] = str(chapter)
+    effective_date = parse_date(unit.get("effective_date") or document.get("effective_date"))
+    if effective_date:
+        metadata["effective_date"] = effective_date
+    return metadata
+
+
+def manifest_path(settings):
+    return settings.CHROMA_PERSIST_PATH / "partitions.json"
+
+
+def _load_manifests(settings) -> dict:
+    try:
+        with open(manifest_path(settings), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def load_partition_manifest(settings, collection_name: str):
+    return _load_manifests(settings).get(collection_name)
+
+
+def _save_partition_manifest(settings, collection_name: str, manifest: dict):
+    manifests = _load_manifests(settings)
+    manifests[collection_name] = manifest
+    path = manifest_path(settings)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifests, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def index_version(settings, collection_name: str):
+    try:
+        with open(settings.CHROMA_PERSIST_PATH / "index_version.json", "r", encoding="utf-8") as f:
+            return json.load(f).get(collection_name, {}).get("version")
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _copy_document(client, main, space: str, collection_name: str, document: dict, units: list[dict], page_size: int) -> int:
+    partition_name = partition_collection_name(collection_name, document["name"])
+    try:
+        client.delete_collection(partition_name)
+    except Exception:
+        pass
+    partition = client.create_collection(
+        name=partition_name,
+        metadata={"hnsw:space": space, "document_name": document["name"]},
+        embedding_function=None,
+    )
+    units_by_id = {unit["id"]: unit for unit in units}
+    unit_ids = list(units_by_id)
+    copied = 0
+    for i in range(0, len(unit_ids), page_size):
+        page = main.get(ids=unit_ids[i:i + page_size], include=["embeddings", "documents", "metadatas"])
+        if not page["ids"]:
+            continue
+        partition.add(
+            ids=page["ids"],
+            embeddings=page["embeddings"],
+            documents=page["documents"],
+            metadatas=[
+                {**(metadata or {}), **unit_filter_metadata(document, units_by_id[unit_id])}
+                for unit_id, metadata in zip(page["ids"], page["metadatas"])
+            ],
+        )
+        copied += len(page["ids"])
+    return copied
+
+
+def build_partitions(settings, client=None, documents=None, page_size: int = 1000) -> dict:
+    """(Re)build the partitions of ``documents`` (all when ``None``) and refresh the manifest.
+
+    Partitions of a different collection id (after a rebuild or migration) are
+    always rebuilt in full.
+    """
+    import chromadb
+
+    from .vector_retriever import distance_space
+
+    start_time = time.perf_counter()
+    collection_name = settings.CHROMA_COLLECTION_NAME
+    client = client or chromadb.PersistentClient(path=str(settings.CHROMA_PERSIST_PATH))
+    main = client.get_collection(collection_name)
+    space = distance_space(main)
+
+    manifest = load_partition_manifest(settings, collection_name)
+    if manifest is None or manifest.get("collection_id") != str(main.id) or manifest.get("space") != space:
+        manifest = {"documents": {}}
+        documents = None
+    wanted = set(documents) if documents is not None else None
+
+    seen = set()
+    rebuilt = 0
+    for filepath in sorted(glob.glob(os.path.join(settings.PARSED_JSON_DIR, "*.json"))):
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        document = {**data.get("document", {})}
+        document["name"] = document.get("name", "Unknown Document")
+        seen.add(document["name"])
+        if wanted is not None and document["name"] not in wanted:
+            continue
+        units = data.get("units", [])
+        count = _copy_document(client, main, space, collection_name, document, units, page_size)
+        manifest["documents"][document["name"]] = {
+            "collection": partition_collection_name(collection_name, document["name"]),
+            "units": count,
+            "topic": document.get("topic"),
+            "effective_date": parse_date(document.get("effective_date")),
+        }
+        rebuilt += 1
+
+    for document_name in list(manifest["documents"]):
+        if document_name not in seen:
+            try:
+                client.delete_collection(manifest["documents"].pop(document_name)["collection"])
+            except Exception:
+                pass
+
+    manifest.update({
+        "collection_id": str(main.id),
+        "space": space,
+        "index_version": index_version(settings, collection_name),
+        "built_at": time.time(),
+    })
+    _save_partition_manifest(settings, collection_name, manifest)
+    stats = {
+        "partitions": len(manifest["documents"]),
+        "rebuilt": rebuilt,
+        "seconds": round(time.perf_counter() - start_time, 2),
+    }
+    logger.info(f"✅ Document partitions for '{collection_name}': {json.dumps(stats)}")
+    return stats
+
+
+class DocumentCatalog:
+    """Known documents with their topic and effective date, used to resolve a free-text scope.
+
+    An LLM-emitted scope names documents or domains loosely ("Bộ luật Lao động",
+    "đất đai"); each term is matched against normalized document names and
+    topics, and only exact catalog names are passed on to the retriever.
+    """
+
+    def __init__(self, documents: dict):
+        self.documents = documents
+        self._normalized = {
+            name: (normalize(name), normalize(info.get("topic") or ""))
+            for name, info in documents.items()
+        }
+
+    @classmethod
+    def from_manifest(cls, manifest: dict):
+        return cls(manifest.get("documents", {}))
+
+    @classmethod
+    def from_names(cls, names):
+        return cls({name: {} for name in names})
+
+    def _match(self, term: str) -> list[str]:
+        term = " ".join(normalize(term).split())
+        if len(term) < 3:
+            return []
+        exact = [name for name, (normalized, _) in self._normalized.items() if normalized == term]
+        if exact:
+            return exact
+        return [
+            name for name, (normalized, topic) in self._normalized.items()
+            if term in normalized or (topic and (term in topic or topic in term))
+        ]
+
+    def resolve(self, scope, max_documents: int):
+        """Turn a raw scope into retriever filters, or ``None`` when it does not narrow anything."""
+        if not isinstance(scope, dict) or not self.documents:
+            return None
+        terms = []
+        for key in ("documents", "topics"):
+            value = scope.get(key) or []
+            terms.extend([value] if isinstance(value, str) else value)
+
+        names = list(dict.fromkeys(name for term in terms if isinstance(term, str) for name in self._match(term)))
+        effective_on = parse_date(scope.get("effective_on"))
+        if effective_on:
+            names = [
+                name for name in (names or self.documents)
+                if not self.documents[name].get("effective_date") or self.documents[name]["effective_date"] <= effective_on
+            ]
+        if not names or len(names) > max_documents or len(names) == len(self.documents):
+            return None
+
+        filters = {"document_names": names}
+        chapters = scope.get("chapters")
+        if chapters:
+            filters["chapters"] = [str(c).upper() for c in ([chapters] if isinstance(chapters, str) else chapters)]
+        return filters
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", nargs="+", help="Only rebuild these documents' partitions.")
+    parser.add_argument("--page-size", type=int, default=1000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from ...core.settings import settings
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    args = parse_args()
+    build_partitions(settings, documents=args.documents, page_size=args.page_size)
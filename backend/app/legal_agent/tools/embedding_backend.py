@@ -0,0 +1,71 @@
+import logging
+
+import torch
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+
+logger = logging.getLogger(__name__)
+
+
+def onnx_file_name(settings) -> str:
+    if settings.EMBEDDING_BACKEND == "onnx-int8":
+        return f"onnx/model_qint8_{settings.EMBEDDING_ONNX_QUANTIZATION}.onnx"
+    return "onnx/model.onnx"
+
+
+def embedding_fingerprint(settings) -> str:
+    """Identifies the vectors the configured model and backend produce, for caches that outlive a process."""
+    if settings.EMBEDDING_BACKEND == "torch":
+        return f"{settings.EMBEDDING_MODEL_NAME}|torch"
+    return f"{settings.EMBEDDING_MODEL_NAME}|{settings.EMBEDDING_BACKEND}|{onnx_file_name(settings)}"
+
+
+class OnnxEmbeddingFunction(EmbeddingFunction[Documents]):
+    """SentenceTransformer running on ONNX Runtime (CPU) from an exported model directory."""
+
+    def __init__(self, model_dir, file_name: str, num_threads: int = 0):
+        import onnxruntime as ort
+        from sentence_transformers import SentenceTransformer
+
+        session_options = ort.SessionOptions()
+        if num_threads > 0:
+            session_options.intra_op_num_threads = num_threads
+        self._model = SentenceTransformer(
+            str(model_dir),
+            device="cpu",
+            backend="onnx",
+            model_kwargs={
+                "file_name": file_name,
+                "provider": "CPUExecutionProvider",
+                "session_options": session_options,
+            },
+        )
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = self._model.encode(
+            list(input), convert_to_numpy=True, normalize_embeddings=False, show_progress_bar=False
+        )
+        return list(embeddings)
+
+
+def get_embedding_function(settings, device: str):
+    backend = settings.EMBEDDING_BACKEND
+    if backend == "torch":
+        if settings.EMBEDDING_NUM_THREADS > 0:
+            torch.set_num_threads(settings.EMBEDDING_NUM_THREADS)
+        logger.info(f"Using embedding model: {settings.EMBEDDING_MODEL_NAME} (PyTorch, device={device})")
+        return embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=settings.EMBEDDING_MODEL_NAME,
+            device=device,
+            normalize_embeddings=False,
+        )
+
+    file_name = onnx_file_name(settings)
+    model_path = settings.EMBEDDING_ONNX_DIR / file_name
+    if not model_path.exists():
+        raise FileNotFoundError(
+            f"ONNX embedding model not found at {model_path}. "
+            f"Run `python save_model.py --export-onnx --quantization {settings.EMBEDDING_ONNX_QUANTIZATION}` first."
+        )
+    logger.info(f"Using embedding model: {model_path} (ONNX Runtime, backend={backend})")
+    return OnnxEmbeddingFunction(settings.EMBEDDING_ONNX_DIR, file_name, settings.EMBEDDING_NUM_THREADS)
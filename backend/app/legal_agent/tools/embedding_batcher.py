@@ -0,0 +1,90 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from ...core.metrics import EMBEDDING_BATCH_DURATION, EMBEDDING_BATCH_REQUESTS, EMBEDDING_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding calls into one batched forward pass.
+
+    Callers on any thread submit their texts and block on a future. A single
+    worker thread takes everything queued so far, waits up to ``max_wait_ms``
+    for more callers unless ``max_batch_size`` texts are already queued, embeds
+    the batch at once and hands each caller its own slice. Requests that arrive
+    while a batch is being encoded are picked up by the next one, so with
+    ``max_wait_ms=0`` batches still form under load without delaying a lone call.
+    """
+
+    def __init__(self, embedding_function, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.embedding_function = embedding_function
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms / 1000)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def __call__(self, texts: list[str]) -> list:
+        if not texts:
+            return []
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork; a batcher created before it restarts in the child.
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker_pid = os.getpid()
+                self._worker.start()
+
+    def _collect(self, first) -> tuple[list, object]:
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if size + len(item[0]) > self.max_batch_size:
+                # Keep the caller's texts together; it opens the next batch.
+                return batch, item
+            batch.append(item)
+            size += len(item[0])
+        return batch, None
+
+    def _run(self):
+        carry = None
+        while True:
+            first = carry or self._queue.get()
+            batch, carry = self._collect(first)
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            start_time = time.perf_counter()
+            try:
+                embeddings = self.embedding_function(texts)
+            except Exception as e:
+                logger.error(f"❌ Batched embedding of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            EMBEDDING_BATCH_DURATION.observe(time.perf_counter() - start_time)
+            EMBEDDING_BATCH_SIZE.observe(len(texts))
+            EMBEDDING_BATCH_REQUESTS.observe(len(batch))
+
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(list(embeddings[offset:offset + len(item_texts)]))
+                offset += len(item_texts)
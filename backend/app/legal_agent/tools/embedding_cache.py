@@ -0,0 +1,147 @@
+import hashlib
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when normalize_text changes so persisted tables keyed the old way are not reused.
+KEY_FORMAT_VERSION = 2
+
+
+def normalize_text(text: str) -> str:
+    # Case is kept: the embedding model is case-sensitive, so "Luật" and "luật" embed differently.
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _key_hash(key: str) -> int:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    # 0 marks an empty slot in the mmap table.
+    return int.from_bytes(digest, "little") or 1
+
+
+class MmapEmbeddingTable:
+    """Direct-mapped, fixed-size embedding table stored in a memory-mapped file.
+
+    Each text hashes to exactly one slot, so processes can share the file
+    without a separate index: a colliding entry simply overwrites the slot.
+    The file name carries a fingerprint of the embedding model and backend,
+    so switching either starts a fresh table instead of serving stale vectors.
+    Reads are seqlock-style: the vector is copied and the slot key re-checked,
+    and a slot rewritten in between counts as a miss.
+    """
+
+    def __init__(self, path, slots: int, fingerprint: str = ""):
+        digest = hashlib.blake2b(f"{KEY_FORMAT_VERSION}|{fingerprint}".encode("utf-8"), digest_size=6).hexdigest()
+        path = Path(path)
+        self.path = str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+        self.slots = slots
+        self.table = None
+
+    def _dtype(self, dim: int):
+        return np.dtype([("key", "<u8"), ("vec", "<f4", (dim,))])
+
+    def _open(self, dim: int):
+        dtype = self._dtype(dim)
+        expected_size = dtype.itemsize * self.slots
+        if os.path.exists(self.path) and os.path.getsize(self.path) == expected_size:
+            self.table = np.memmap(self.path, dtype=dtype, mode="r+", shape=(self.slots,))
+        else:
+            logger.info(f"Creating embedding mmap table at {self.path} ({self.slots} slots, dim={dim}).")
+            self.table = np.memmap(self.path, dtype=dtype, mode="w+", shape=(self.slots,))
+
+    def _probe_dim(self):
+        if not os.path.exists(self.path):
+            return None
+        size = os.path.getsize(self.path)
+        if size == 0 or size % self.slots:
+            return None
+        dim, remainder = divmod(size // self.slots - 8, 4)
+        return dim if dim > 0 and not remainder else None
+
+    def get(self, key: str):
+        if self.table is None:
+            dim = self._probe_dim()
+            if dim is None:
+                return None
+            self._open(dim)
+        h = _key_hash(key)
+        slot = h % self.slots
+        if int(self.table["key"][slot]) != h:
+            return None
+        vector = np.array(self.table["vec"][slot], dtype=np.float32)
+        if int(self.table["key"][slot]) != h:
+            # Another process rewrote the slot while it was being copied.
+            return None
+        return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        if self.table is None or self.table.dtype["vec"].shape[0] != vector.shape[0]:
+            self._open(vector.shape[0])
+        h = _key_hash(key)
+        slot = h % self.slots
+        # Clear the key first so concurrent readers never pair it with a half-written vector.
+        self.table["key"][slot] = 0
+        self.table["vec"][slot] = vector
+        self.table["key"][slot] = h
+
+
+class EmbeddingCache:
+    """Bounded LRU of float32 embeddings keyed by normalized text."""
+
+    def __init__(self, max_entries: int, mmap_path=None, mmap_slots: int = 65536, fingerprint: str = ""):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._mmap = MmapEmbeddingTable(mmap_path, mmap_slots, fingerprint) if mmap_path else None
+
+    def get(self, text: str):
+        key = normalize_text(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            if self._mmap is not None:
+                vector = self._mmap.get(key)
+                if vector is not None:
+                    self._remember(key, vector)
+                    self.hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, embedding):
+        key = normalize_text(text)
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        with self._lock:
+            self._remember(key, vector)
+            if self._mmap is not None:
+                self._mmap.put(key, vector)
+        return vector
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,134 @@
+import logging
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+CITATION_PATTERN = re.compile(r"\bđiều\s+(\d+[a-zđ]?)\b")
+
+# Very frequent Vietnamese syllables that carry little lexical signal but have
+# huge posting lists in a legal corpus.
+STOPWORDS = {
+    "và", "của", "là", "các", "có", "được", "cho", "với", "trong", "theo", "này", "đó",
+    "những", "một", "khi", "thì", "để", "không", "về", "do", "tại", "từ", "bị", "hoặc",
+    "gì", "nào", "như", "đã", "sẽ", "phải", "người", "quy", "định",
+}
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+def build_match_query(query: str):
+    """Build an FTS5 MATCH expression: the whole phrase OR its content syllables."""
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    terms = [f'"{" ".join(tokens)}"'] if len(tokens) > 1 else []
+    terms += [f'"{token}"' for token in dict.fromkeys(tokens) if token not in STOPWORDS]
+    return " OR ".join(terms) if terms else f'"{tokens[0]}"'
+
+
+def parse_citation(query: str):
+    """Return (article_number, document_hint) for queries like "Điều 651 Bộ luật Dân sự"."""
+    normalized = normalize(query)
+    match = CITATION_PATTERN.search(normalized)
+    if not match:
+        return None
+    document_hint = " ".join(CITATION_PATTERN.sub(" ", normalized).split())
+    return match.group(1), document_hint
+
+
+def reciprocal_rank_fusion(result_lists: list[list[dict]], k: int = 60) -> list[dict]:
+    """Fuse ranked hit lists with RRF; ``similarity`` becomes the normalized fused score."""
+    scores = {}
+    hits = {}
+    for results in result_lists:
+        for rank, hit in enumerate(results):
+            scores[hit["id"]] = scores.get(hit["id"], 0.0) + 1.0 / (k + rank + 1)
+            hits.setdefault(hit["id"], hit)
+
+    max_score = len(result_lists) / (k + 1)
+    fused = []
+    for hit_id, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+        fused.append({**hits[hit_id], "similarity": round(score / max_score, 4)})
+    return fused
+
+
+class LexicalIndex:
+    """BM25 keyword search and exact article lookups over the unit store's FTS5 index."""
+
+    def __init__(self, unit_store):
+        self.unit_store = unit_store
+
+    def lookup_citation(self, query: str, n_results: int = 5, document_names: list[str] = None) -> list[dict]:
+        """Units of the article a query cites, in document order.
+
+        Returns ``[]`` unless the query is a bare citation ("Điều 651") or the
+        rest of it names a document holding that article ("Điều 651 Bộ luật Dân
+        sự"); anything else is left to hybrid search. Hits carry no similarity
+        of their own, fusion ranks them alongside the other lexical hits.
+        """
+        citation = parse_citation(query)
+        if not citation:
+            return []
+        article_number, document_hint = citation
+        sql = "SELECT id, document_name FROM units WHERE article_number = ?"
+        params = [article_number]
+        if document_names:
+            sql += f" AND document_name IN ({','.join('?' * len(document_names))})"
+            params.extend(document_names)
+        rows = self.unit_store.execute(f"{sql} ORDER BY position", params).fetchall()
+        if document_hint:
+            rows = [row for row in rows if document_hint in normalize(row[1] or "")]
+
+        units = self.unit_store.get_many([row[0] for row in rows[:n_results]])
+        return [
+            {
+                "id": unit["id"],
+                "document_name": unit.get("document_name"),
+                "content": unit.get("content"),
+                "context": unit.get("context"),
+            }
+            for unit in units
+        ]
+
+    def search(self, query: str, n_results: int = 5, document_names: list[str] = None) -> list[dict]:
+        match_query = build_match_query(query)
+        if not match_query:
+            return []
+        sql = "SELECT id, document_name, context, content, bm25(units_fts) AS score FROM units_fts WHERE units_fts MATCH ?"
+        params = [match_query]
+        if document_names:
+            sql += f" AND document_name IN ({','.join('?' * len(document_names))})"
+            params.extend(document_names)
+        try:
+            rows = self.unit_store.execute(f"{sql} ORDER BY score LIMIT ?", (*params, n_results)).fetchall()
+        except Exception as e:
+            logger.error(f"Error querying lexical index: {e}", exc_info=True)
+            return []
+        return [
+            {
+                "id": unit_id,
+                "document_name": document_name,
+                "content": content,
+                "context": context,
+                # FTS5 bm25() is negative; lower is better.
+                "similarity": round(-score, 4),
+            }
+            for unit_id, document_name, context, content, score in rows
+        ]
+
+    def search_many(self, queries: list[str], n_results: int = 5, document_names: list[str] = None) -> list[dict]:
+        ranked = {}
+        for query in dict.fromkeys(queries):
+            hits = self.lookup_citation(query, n_results, document_names) or self.search(query, n_results, document_names)
+            for rank, hit in enumerate(hits):
+                if hit["id"] not in ranked or rank < ranked[hit["id"]][0]:
+                    ranked[hit["id"]] = (rank, hit)
+        return [hit for _, hit in sorted(ranked.values(), key=lambda item: item[0])]
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+
+import httpx
+import openai
+from langchain_core.messages import AIMessage
+from langchain_openai import ChatOpenAI
+
+from ...core.metrics import LLM_MEMO_LOOKUPS
+from .llm_memo_cache import LLMMemoCache, memo_key
+
+logger = logging.getLogger(__name__)
+
+# Short, structured steps that a smaller model handles well.
+FAST_NODES = {"router", "simple_keyword_extractor", "keyword_extractor"}
+
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    httpx.TransportError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples = {}
+
+    def record(self, node: str, seconds: float):
+        self._samples.setdefault(node, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, node: str, q: float, min_samples: int):
+        samples = self._samples.get(node)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LLMGateway:
+    """Single entry point for every LLM call made by the agent graph.
+
+    All models share one keep-alive (optionally HTTP/2) connection pool. Each
+    call gets a per-node model and jittered retries; non-streamed calls can be
+    hedged by firing a duplicate once the node's p95 latency has passed, and
+    enabled nodes are answered from an exact-match memo cache.
+
+    Every call is streamed and timed out on connect, on the first token (per
+    node) and on the gap between chunks, never on its total duration, so long
+    answers are not cut off. Handing a token to a slow client through
+    ``token_sink`` gets its own ``STREAM_CLIENT_TIMEOUT_SECONDS`` limit, so a
+    client that stops reading cannot hold the call (and its LLM slot) forever.
+    """
+
+    def __init__(self, settings, llm=None):
+        self.settings = settings
+        self.latencies = LatencyTracker()
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._models = {}
+        self._default_llm = llm
+        self.memo_cache = None
+        if settings.LLM_MEMO_CACHE_ENABLED:
+            self.memo_cache = LLMMemoCache(
+                max_entries=settings.LLM_MEMO_CACHE_SIZE,
+                ttl_seconds=settings.LLM_MEMO_CACHE_TTL_SECONDS,
+                sqlite_path=settings.LLM_MEMO_CACHE_SQLITE_PATH,
+            )
+        self.http_client = None
+        if llm is None:
+            self.http_client = httpx.AsyncClient(
+                http2=settings.LLM_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                # Backstop only; the first-token and chunk-gap timeouts are enforced per call.
+                timeout=httpx.Timeout(
+                    max(settings.LLM_TIMEOUT_SECONDS, settings.LLM_STREAM_IDLE_TIMEOUT_SECONDS, *settings.LLM_NODE_TIMEOUTS.values()),
+                    connect=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+                ),
+            )
+
+    def model_for(self, node: str) -> str:
+        if node in self.settings.LLM_NODE_MODELS:
+            return self.settings.LLM_NODE_MODELS[node]
+        if node in FAST_NODES and self.settings.LLM_FAST_MODEL_NAME:
+            return self.settings.LLM_FAST_MODEL_NAME
+        return self.settings.LLM_MODEL_NAME
+
+    def timeout_for(self, node: str) -> float:
+        """Longest wait for the node's first token."""
+        return self.settings.LLM_NODE_TIMEOUTS.get(node, self.settings.LLM_TIMEOUT_SECONDS)
+
+    def llm_for(self, node: str):
+        if self._default_llm is not None:
+            return self._default_llm
+        model_name = self.model_for(node)
+        llm = self._models.get(model_name)
+        if llm is None:
+            llm = ChatOpenAI(
+                model=model_name,
+                openai_api_key=self.settings.OPENAI_API_KEY,
+                base_url=self.settings.OPENAI_BASE_URL,
+                temperature=0,
+                streaming=True,
+                stream_usage=True,
+                # Retries and timeouts are handled here, per node.
+                max_retries=0,
+                http_async_client=self.http_client,
+            )
+            self._models[model_name] = llm
+        return llm
+
+    async def ainvoke(self, node: str, prompt: str, token_sink: asyncio.Queue = None):
+        """Call the node's model; with a ``token_sink`` the answer is streamed into it as ``("token", text)``."""
+        llm = self.llm_for(node)
+        cache_key = None
+        if token_sink is None and self.memo_cache is not None and self.settings.LLM_MEMO_CACHE_NODES.get(node):
+            model_name = getattr(llm, "model_name", None) or type(llm).__name__
+            # Each node renders exactly one template, so the node name identifies it.
+            cache_key = memo_key(model_name, node, prompt)
+            cached = await self.memo_cache.aget(cache_key)
+            LLM_MEMO_LOOKUPS.labels(node, "hit" if cached is not None else "miss").inc()
+            if cached is not None:
+                return AIMessage(content=cached)
+
+        timeout = self.timeout_for(node)
+        stream_state = {"started": False}
+
+        for attempt in range(self.settings.LLM_MAX_RETRIES + 1):
+            start_time = time.perf_counter()
+            try:
+                if token_sink is not None:
+                    response = await self._stream(llm, prompt, timeout, token_sink, stream_state)
+                else:
+                    response = await self._hedged_call(node, llm, prompt, timeout)
+            except RETRYABLE_ERRORS as e:
+                # Once tokens reached the client a retry would duplicate them.
+                if stream_state["started"] or attempt == self.settings.LLM_MAX_RETRIES:
+                    raise
+                delay = random.uniform(0, self.settings.LLM_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+                logger.warning(
+                    f"LLM call for '{node}' failed ({type(e).__name__}), "
+                    f"retry {attempt + 1}/{self.settings.LLM_MAX_RETRIES} in {delay:.2f}s."
+                )
+                await asyncio.sleep(delay)
+                continue
+            self.latencies.record(node, time.perf_counter() - start_time)
+            if cache_key is not None:
+                await self.memo_cache.aput(cache_key, response.content)
+            return response
+
+    async def _stream(self, llm, prompt: str, first_token_timeout: float, token_sink: asyncio.Queue = None, stream_state: dict = None):
+        loop = asyncio.get_running_loop()
+        idle_timeout = self.settings.LLM_STREAM_IDLE_TIMEOUT_SECONDS
+        client_timeout = self.settings.STREAM_CLIENT_TIMEOUT_SECONDS
+        response = None
+        waiting_on_client = False
+        try:
+            async with asyncio.timeout(first_token_timeout) as deadline:
+                async for chunk in llm.astream(prompt):
+                    if token_sink is not None and chunk.content:
+                        stream_state["started"] = True
+                        # A slow client is backpressure, not a stalled model, but it gets a limit too.
+                        deadline.reschedule(loop.time() + client_timeout)
+                        waiting_on_client = True
+                        await token_sink.put(("token", chunk.content))
+                        waiting_on_client = False
+                    deadline.reschedule(loop.time() + idle_timeout)
+                    response = chunk if response is None else response + chunk
+        except TimeoutError:
+            if waiting_on_client:
+                logger.warning(f"Client took no tokens for {client_timeout}s, abandoning the LLM stream.")
+            raise
+        return response
+
+    async def _hedged_call(self, node: str, llm, prompt: str, timeout: float):
+        hedge_delay = None
+        if self.settings.LLM_HEDGING_ENABLED:
+            hedge_delay = self.latencies.quantile(
+                node, self.settings.LLM_HEDGE_QUANTILE, self.settings.LLM_HEDGE_MIN_SAMPLES
+            )
+        if hedge_delay is None:
+            return await self._stream(llm, prompt, timeout)
+
+        # Each attempt enforces its own first-token and chunk-gap timeouts.
+        primary = asyncio.create_task(self._stream(llm, prompt, timeout))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                self.hedged += 1
+                logger.info(f"Hedging LLM call for '{node}' after {hedge_delay * 1000:.0f} ms.")
+                tasks.add(asyncio.create_task(self._stream(llm, prompt, timeout)))
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                if not tasks:
+                    # Every attempt failed; surface the last error.
+                    raise next(iter(done)).exception()
+        finally:
+            for task in tasks | {primary}:
+                task.cancel()
+
+    def stats(self) -> dict:
+        stats = {"hedged": self.hedged, "hedge_wins": self.hedge_wins}
+        if self.memo_cache is not None:
+            stats["memo_cache"] = self.memo_cache.stats()
+        return stats
+
+    async def aclose(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def memo_key(model_name: str, template_name: str, prompt: str) -> str:
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{model_name}:{template_name}:{prompt_hash}"
+
+
+class LLMMemoCache:
+    """Exact-match cache of LLM responses for deterministic (temperature 0) steps.
+
+    Keys are content addresses of (model, template, rendered prompt). Lookups hit
+    a bounded in-process LRU first and then, if configured, a SQLite file that
+    several workers can share. Both tiers honour the same TTL. The SQLite tier
+    runs in worker threads, off the event loop, and expired rows are purged at
+    most every ``purge_interval_seconds`` rather than on every write.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, sqlite_path=None, purge_interval_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = str(sqlite_path) if sqlite_path else None
+        self.purge_interval_seconds = purge_interval_seconds
+        self._next_purge = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if self.sqlite_path:
+            with self._connection() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_memo ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL) WITHOUT ROWID"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_memo_created_at ON llm_memo (created_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Short busy timeout: a contended shared tier is treated as a miss, never waited on.
+            conn = sqlite3.connect(self.sqlite_path, timeout=0.1)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, value: str, created_at: float):
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _shared_get(self, key: str):
+        try:
+            return self._connection().execute(
+                "SELECT value, created_at FROM llm_memo WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM memo cache lookup failed: {e}")
+            return None
+
+    def _shared_put(self, key: str, value: str, now: float):
+        try:
+            with self._connection() as conn:
+                conn.execute("INSERT OR REPLACE INTO llm_memo VALUES (?, ?, ?)", (key, value, now))
+                if self.ttl_seconds > 0 and now >= self._next_purge:
+                    # Any worker may purge; a few redundant DELETEs are harmless.
+                    self._next_purge = now + self.purge_interval_seconds
+                    conn.execute("DELETE FROM llm_memo WHERE created_at < ?", (now - self.ttl_seconds,))
+        except sqlite3.Error as e:
+            logger.warning(f"LLM memo cache write failed: {e}")
+
+    async def aget(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._is_expired(entry[1], now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+
+        if self.sqlite_path:
+            row = await asyncio.to_thread(self._shared_get, key)
+            if row is not None and not self._is_expired(row[1], now):
+                with self._lock:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                return row[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def aput(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        if self.sqlite_path:
+            await asyncio.to_thread(self._shared_put, key, value, now)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
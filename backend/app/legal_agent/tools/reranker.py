@@ -0,0 +1,79 @@
+import logging
+import threading
+import time
+from functools import lru_cache
+
+from sentence_transformers import CrossEncoder
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def load_cross_encoder(model_name: str, device: str) -> CrossEncoder:
+    # Shared per process, so a model loaded before a pre-fork server forks is reused by its workers.
+    logger.info(f"Loading cross-encoder reranker: {model_name}")
+    return CrossEncoder(model_name, device=device, max_length=512)
+
+
+class Reranker:
+    """Scores (query, unit) pairs with a local cross-encoder in one batched pass.
+
+    A latency guard estimates the cost of the next call from a moving average of
+    the per-pair scoring time and the number of reranks already running; when the
+    estimate exceeds ``max_latency_ms`` the hits are returned unchanged.
+    """
+
+    def __init__(self, settings, device: str = "cpu"):
+        self.settings = settings
+        self.max_latency_ms = settings.RERANK_MAX_LATENCY_MS
+        self.model = load_cross_encoder(settings.RERANKER_MODEL_NAME, device)
+        self.skipped = 0
+        self._ms_per_pair = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        self.model.predict([("khởi động", "khởi động")], show_progress_bar=False)
+
+    def _estimated_latency_ms(self, n_pairs: int) -> float:
+        if self._ms_per_pair is None:
+            return 0.0
+        return self._ms_per_pair * n_pairs * (self._in_flight + 1)
+
+    def rerank(self, query: str, hits: list[dict], top_k: int):
+        """Return ``(hits, reranked)``; ``hits`` are truncated to ``top_k`` either way."""
+        if len(hits) <= 1:
+            return hits[:top_k], False
+
+        with self._lock:
+            estimated_ms = self._estimated_latency_ms(len(hits))
+            if estimated_ms > self.max_latency_ms:
+                self.skipped += 1
+                # Decay the estimate so a transient slowdown does not disable reranking for good.
+                self._ms_per_pair *= 0.9
+                logger.warning(
+                    f"Skipping rerank of {len(hits)} hits: estimated {estimated_ms:.0f} ms "
+                    f"exceeds {self.max_latency_ms} ms."
+                )
+                return hits[:top_k], False
+            self._in_flight += 1
+
+        start_time = time.perf_counter()
+        try:
+            pairs = [
+                (query, "\n".join(part for part in (hit.get("context"), hit.get("content")) if part))
+                for hit in hits
+            ]
+            scores = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        finally:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            with self._lock:
+                self._in_flight -= 1
+                ms_per_pair = elapsed_ms / len(hits)
+                if self._ms_per_pair is None:
+                    self._ms_per_pair = ms_per_pair
+                else:
+                    self._ms_per_pair = 0.8 * self._ms_per_pair + 0.2 * ms_per_pair
+
+        ranked = sorted(zip(hits, scores), key=lambda item: item[1], reverse=True)
+        return [{**hit, "rerank_score": round(float(score), 4)} for hit, score in ranked[:top_k]], True
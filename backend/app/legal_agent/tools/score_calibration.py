@@ -0,0 +1,132 @@
+"""Per-collection similarity cutoff computed from a small labeled query set.
+
+Usage (from the ``backend`` directory):
+
+    python -m app.legal_agent.tools.score_calibration --queries labeled.jsonl
+
+``labeled.jsonl`` holds ``{"query": ..., "relevant_ids": [...]}`` records. The
+cutoff is the highest similarity that still keeps ``--target-recall`` of the
+relevant units found in the top ``--n-results``; hits below it are dropped
+before they reach the LLM. Results are stored per collection in
+``CHROMA_PERSIST_PATH/score_calibration.json``.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def calibration_path(settings):
+    return settings.CHROMA_PERSIST_PATH / "score_calibration.json"
+
+
+def _load_all(settings) -> dict:
+    try:
+        with open(calibration_path(settings), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def load_calibration(settings, collection_name: str):
+    return _load_all(settings).get(collection_name)
+
+
+def save_calibration(settings, collection_name: str, calibration: dict):
+    calibrations = _load_all(settings)
+    calibrations[collection_name] = calibration
+    path = calibration_path(settings)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(calibrations, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_labeled_queries(path) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [r for r in records if r.get("query") and r.get("relevant_ids")]
+
+
+def choose_threshold(scored_hits: list[tuple[float, bool]], target_recall: float) -> dict:
+    """Pick the highest cutoff keeping ``target_recall`` of the relevant hits.
+
+    ``scored_hits`` are ``(similarity, is_relevant)`` pairs for every retrieved hit.
+    """
+    relevant_scores = sorted((score for score, relevant in scored_hits if relevant), reverse=True)
+    if not relevant_scores:
+        raise ValueError("None of the labeled relevant units were retrieved; cannot calibrate.")
+    keep = max(1, math.ceil(target_recall * len(relevant_scores)))
+    # Round down so the boundary hit still passes the >= comparison.
+    threshold = math.floor(relevant_scores[keep - 1] * 10000) / 10000
+
+    kept = [relevant for score, relevant in scored_hits if score >= threshold]
+    kept_relevant = sum(kept)
+    return {
+        "threshold": threshold,
+        "recall": round(kept_relevant / len(relevant_scores), 4),
+        "precision": round(kept_relevant / len(kept), 4) if kept else 0.0,
+        "hits": len(scored_hits),
+        "kept_hits": len(kept),
+        "relevant_hits": len(relevant_scores),
+    }
+
+
+def calibrate(retriever, labeled_queries: list[dict], n_results: int = 20, target_recall: float = 0.95) -> dict:
+    queries = [record["query"] for record in labeled_queries]
+    results = retriever.collection.query(
+        query_embeddings=retriever.embed(queries),
+        n_results=n_results,
+        include=["distances"],
+    )
+    scored_hits = []
+    for record, ids, distances in zip(labeled_queries, results["ids"], results["distances"]):
+        relevant_ids = set(record["relevant_ids"])
+        for hit_id, distance in zip(ids, distances):
+            scored_hits.append((retriever.similarity(distance), hit_id in relevant_ids))
+
+    calibration = choose_threshold(scored_hits, target_recall)
+    calibration.update({
+        "space": retriever.space,
+        "queries": len(labeled_queries),
+        "n_results": n_results,
+        "target_recall": target_recall,
+        "calibrated_at": time.time(),
+    })
+    return calibration
+
+
+def calibrate_collection(settings, retriever, queries_path, n_results: int, target_recall: float) -> dict:
+    labeled_queries = load_labeled_queries(queries_path)
+    if not labeled_queries:
+        raise ValueError(f"No labeled queries with relevant_ids in {queries_path}.")
+    calibration = calibrate(retriever, labeled_queries, n_results, target_recall)
+    save_calibration(settings, settings.CHROMA_COLLECTION_NAME, calibration)
+    retriever.min_similarity = calibration["threshold"]
+    logger.info(
+        f"✅ Calibrated '{settings.CHROMA_COLLECTION_NAME}' ({calibration['space']}): "
+        f"threshold {calibration['threshold']}, keeps {calibration['kept_hits']}/{calibration['hits']} hits "
+        f"at recall {calibration['recall']} and precision {calibration['precision']}."
+    )
+    return calibration
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", required=True, help="JSONL file of labeled queries.")
+    parser.add_argument("--n-results", type=int, default=20)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from ...core.settings import settings
+    from .vector_retriever import VectorRetriever
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    args = parse_args()
+    calibrate_collection(settings, VectorRetriever(settings), args.queries, args.n_results, args.target_recall)
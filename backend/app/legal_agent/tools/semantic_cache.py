@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no pre-fork workers, the process always owns the file.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Answer cache keyed on query embeddings.
+
+    Stores the SSE events of a completed run and replays them for later queries
+    whose embedding is close enough (cosine similarity >= threshold). Entries
+    expire after a TTL, the oldest are evicted once ``max_entries`` is reached,
+    and the whole cache is dropped when the Chroma collection fingerprint changes.
+
+    With several workers each keeps its own cache, all load the persisted file
+    at startup, and only the worker holding ``<persist_path>.lock`` writes it.
+    If that worker exits, the next one to save takes the lock over.
+
+    Embeddings live in a preallocated matrix where a stored entry takes one
+    row and a removed one is swapped with the last row, so a request never
+    restacks the cache. Changes are persisted from a timer thread at most
+    every ``save_delay_seconds``, and by ``flush()`` at shutdown.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: int, max_entries: int, persist_path=None, save_delay_seconds: float = 5.0):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.save_delay_seconds = save_delay_seconds
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        # Rows [0, len(_row_keys)) of _matrix hold the embeddings of _row_keys.
+        self._matrix = None
+        self._row_keys = []
+        self._rows = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self._owner_lock = None
+
+        if self.persist_path:
+            self._load()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _is_expired(self, entry, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["created_at"] > self.ttl_seconds
+
+    def _rebuild_matrix(self):
+        self._row_keys = list(self._entries.keys())
+        self._rows = {key: row for row, key in enumerate(self._row_keys)}
+        if self._row_keys:
+            self._matrix = np.stack([self._entries[k]["embedding"] for k in self._row_keys])
+        else:
+            self._matrix = None
+
+    def _add_row(self, key: str, vector: np.ndarray):
+        row = len(self._row_keys)
+        if self._matrix is None:
+            self._matrix = np.empty((16, vector.shape[0]), dtype=np.float32)
+        elif row == len(self._matrix):
+            self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+        self._matrix[row] = vector
+        self._row_keys.append(key)
+        self._rows[key] = row
+
+    def _remove_row(self, key: str):
+        row = self._rows.pop(key)
+        last_key = self._row_keys.pop()
+        if last_key != key:
+            self._matrix[row] = self._matrix[len(self._row_keys)]
+            self._row_keys[row] = last_key
+            self._rows[last_key] = row
+
+    def check_fingerprint(self, fingerprint: str):
+        with self._lock:
+            if self.fingerprint is not None and fingerprint != self.fingerprint and self._entries:
+                logger.info("Vector collection changed, invalidating semantic cache.")
+                self._entries.clear()
+                self._rebuild_matrix()
+                self._schedule_save()
+            self.fingerprint = fingerprint
+
+    def lookup(self, embedding):
+        query_vector = self._normalize(embedding)
+        now = time.time()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if self._is_expired(e, now)]
+            for key in expired:
+                del self._entries[key]
+                self._remove_row(key)
+            if expired:
+                self._schedule_save()
+
+            if not self._row_keys:
+                self.misses += 1
+                return None
+
+            scores = self._matrix[:len(self._row_keys)] @ query_vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            key = self._row_keys[best]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            entry = self._entries[key]
+            logger.info(
+                f"Semantic cache hit (similarity={scores[best]:.4f}) for cached query: {entry['query']!r}"
+            )
+            return entry["events"]
+
+    def store(self, query: str, embedding, events: list[dict]):
+        if not events:
+            return
+        key = str(uuid4())
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._entries[key] = {
+                "query": query,
+                "embedding": vector,
+                "events": events,
+                "created_at": time.time(),
+            }
+            self._add_row(key, vector)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._remove_row(evicted)
+            self._schedule_save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rebuild_matrix()
+            self._schedule_save()
+
+    def _schedule_save(self):
+        # Called with the lock held; later changes ride on the pending save.
+        if not self.persist_path or self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.save_delay_seconds, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def flush(self):
+        """Persist pending changes now instead of waiting for the timer."""
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer is None:
+                    return
+                self._save_timer.cancel()
+                self._save_timer = None
+                fingerprint = self.fingerprint
+                entries = list(self._entries.values())
+            self._save(fingerprint, entries)
+
+    def _owns_file(self) -> bool:
+        if self._owner_lock is not None or fcntl is None:
+            return True
+        lock_file = open(f"{self.persist_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Held for the life of the process; the OS releases it if the worker dies.
+        self._owner_lock = lock_file
+        logger.info(f"Process {os.getpid()} persists the semantic cache to {self.persist_path}.")
+        return True
+
+    def _save(self, fingerprint, entries: list[dict]):
+        if not self._owns_file():
+            return
+        payload = {
+            "fingerprint": fingerprint,
+            "entries": [
+                {
+                    "query": e["query"],
+                    "embedding": e["embedding"].tolist(),
+                    "events": e["events"],
+                    "created_at": e["created_at"],
+                }
+                for e in entries
+            ],
+        }
+        tmp_path = f"{self.persist_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except OSError as e:
+            logger.warning(f"Could not persist semantic cache to {self.persist_path}: {e}")
+
+    def _load(self):
+        if not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not load semantic cache from {self.persist_path}: {e}")
+            return
+
+        self.fingerprint = payload.get("fingerprint")
+        now = time.time()
+        for e in payload.get("entries", [])[-self.max_entries:]:
+            entry = {
+                "query": e["query"],
+                "embedding": np.asarray(e["embedding"], dtype=np.float32),
+                "events": e["events"],
+                "created_at": e["created_at"],
+            }
+            if not self._is_expired(entry, now):
+                self._entries[str(uuid4())] = entry
+        self._rebuild_matrix()
+        logger.info(f"✅ Loaded {len(self._entries)} semantic cache entries from {self.persist_path}.")
@@ -0,0 +1,25 @@
+import logging
+from functools import lru_cache
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model_name: str):
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer for '{model_name}', falling back to an estimate: {e}")
+        return None
+
+
+def count_tokens(text: str, model_name: str = "gpt-4o-mini") -> int:
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        # Vietnamese averages roughly three characters per token with OpenAI tokenizers.
+        return len(text) // 3 + 1
+    return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,193 @@
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+ARTICLE_ID_PATTERN = re.compile(r"_điều-([^_\s]+)")
+ARTICLE_NUMBER_PATTERN = re.compile(r"\d+[a-zđ]?")
+
+
+def article_id_of(unit_id: str):
+    match = ARTICLE_ID_PATTERN.search(unit_id)
+    return unit_id[: match.end()] if match else None
+
+
+def article_number_of(unit_id: str):
+    match = ARTICLE_ID_PATTERN.search(unit_id)
+    if not match:
+        return None
+    number = ARTICLE_NUMBER_PATTERN.match(match.group(1))
+    return number.group(0) if number else None
+
+
+def build_unit_store(json_dir, store_path) -> int:
+    """Build the SQLite unit store from every ``*.json`` file in ``json_dir``.
+
+    The database is written to a temporary file and atomically moved into place,
+    so readers in other processes never see a half-built store.
+    """
+    start_time = time.perf_counter()
+    store_path = str(store_path)
+    tmp_path = f"{store_path}.{os.getpid()}.building"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(
+        "CREATE TABLE units ("
+        "id TEXT PRIMARY KEY, article_id TEXT, article_number TEXT, position INTEGER NOT NULL, "
+        "document_name TEXT, data TEXT NOT NULL) WITHOUT ROWID"
+    )
+    # Inverted index over unit text for lexical (BM25) retrieval. Diacritics are
+    # kept because they distinguish Vietnamese syllables ("thừa" vs "thua").
+    conn.execute(
+        "CREATE VIRTUAL TABLE units_fts USING fts5("
+        "id UNINDEXED, document_name UNINDEXED, context, content, "
+        "tokenize = 'unicode61 remove_diacritics 0')"
+    )
+
+    total_units = 0
+    json_files = sorted(glob.glob(os.path.join(json_dir, "*.json")))
+    for filepath in json_files:
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        doc_name = data.get("document", {}).get("name", "Unknown Document")
+        rows = []
+        fts_rows = []
+        for unit in data.get("units", []):
+            unit["document_name"] = doc_name
+            rows.append((
+                unit["id"],
+                article_id_of(unit["id"]),
+                article_number_of(unit["id"]),
+                total_units + len(rows),
+                doc_name,
+                json.dumps(unit, ensure_ascii=False),
+            ))
+            fts_rows.append((unit["id"], doc_name, unit.get("context") or "", unit.get("content") or ""))
+        conn.executemany("INSERT OR REPLACE INTO units VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO units_fts VALUES (?, ?, ?, ?)", fts_rows)
+        total_units += len(rows)
+
+    conn.execute("CREATE INDEX idx_units_article ON units (article_id, position)")
+    conn.execute("CREATE INDEX idx_units_article_number ON units (article_number, position)")
+    conn.execute("INSERT INTO units_fts(units_fts) VALUES ('optimize')")
+    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, store_path)
+    logger.info(
+        f"✅ Built unit store with {total_units} units from {len(json_files)} files "
+        f"in {time.perf_counter() - start_time:.1f}s: {store_path}"
+    )
+    return total_units
+
+
+def is_unit_store_stale(json_dir, store_path) -> bool:
+    if not os.path.exists(store_path):
+        return True
+    with closing(sqlite3.connect(f"file:{store_path}?mode=ro", uri=True)) as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            return True
+    store_mtime = os.path.getmtime(store_path)
+    return any(
+        os.path.getmtime(filepath) > store_mtime
+        for filepath in glob.glob(os.path.join(json_dir, "*.json"))
+    )
+
+
+class UnitStore:
+    """Read-only, on-demand access to parsed units backed by a prebuilt SQLite file.
+
+    Units are decoded only when requested and the most recently used ones are
+    kept in a bounded LRU. The database is opened read-only and memory-mapped,
+    so every worker process shares the same OS page cache.
+    """
+
+    def __init__(self, store_path, cache_size: int = 2048):
+        self.store_path = str(store_path)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.store_path}?mode=ro", uri=True)
+            conn.execute("PRAGMA query_only=1")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        return self._connection().execute(sql, params)
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM units").fetchone()[0]
+
+    def document_names(self) -> list[str]:
+        rows = self._connection().execute("SELECT DISTINCT document_name FROM units WHERE document_name IS NOT NULL")
+        return [row[0] for row in rows]
+
+    def _remember(self, unit_id: str, unit: dict):
+        with self._lock:
+            self._cache[unit_id] = unit
+            self._cache.move_to_end(unit_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, unit_id: str):
+        units = self.get_many([unit_id])
+        return units[0] if units else None
+
+    def get_many(self, unit_ids: list[str]) -> list[dict]:
+        found = {}
+        missing = []
+        with self._lock:
+            for unit_id in unit_ids:
+                unit = self._cache.get(unit_id)
+                if unit is None:
+                    missing.append(unit_id)
+                else:
+                    self._cache.move_to_end(unit_id)
+                    found[unit_id] = unit
+
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            rows = self._connection().execute(
+                f"SELECT id, data FROM units WHERE id IN ({placeholders})", missing
+            )
+            for unit_id, data in rows:
+                unit = json.loads(data)
+                self._remember(unit_id, unit)
+                found[unit_id] = unit
+
+        return [found[unit_id] for unit_id in unit_ids if unit_id in found]
+
+    def get_article_unit_ids(self, article_id: str) -> list[str]:
+        rows = self._connection().execute(
+            "SELECT id FROM units WHERE article_id = ? ORDER BY position", (article_id,)
+        )
+        return [row[0] for row in rows]
+
+    def get_article_units(self, article_id: str) -> list[dict]:
+        return self.get_many(self.get_article_unit_ids(article_id))
+
+
+if __name__ == "__main__":
+    from ...core.settings import settings
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    build_unit_store(settings.PARSED_JSON_DIR, settings.UNIT_STORE_PATH)
@@ -1,35 +1,97 @@
 import logging
 import chromadb
+import numpy as np
 import torch
-from chromadb.utils import embedding_functions
+
+from .embedding_backend import embedding_fingerprint, get_embedding_function
+from .embedding_batcher import EmbeddingBatcher
+from .embedding_cache import EmbeddingCache
+from .document_scope import index_version, load_partition_manifest
+from .score_calibration import load_calibration
 
 logger = logging.getLogger(__name__)
 
+
+def distance_space(collection) -> str:
+    space = (collection.metadata or {}).get("hnsw:space")
+    if space is None:
+        space = ((collection.configuration or {}).get("hnsw") or {}).get("space")
+    return space or "l2"
+
+
+def normalize_rows(embeddings) -> np.ndarray:
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def similarity_from_distance(distance: float) -> float:
+    # Chroma reports cosine and ip as 1 - similarity. For l2 (the squared
+    # distance) this is the historical score, which only maps onto cosine for
+    # unit-length vectors; legacy l2 collections need migrating or calibrating.
+    return 1 - distance
+
+
 class VectorRetriever:
-    def __init__(self, settings):
+    def __init__(self, settings, embedding_function=None):
         self.settings = settings
         self.device = self._get_device()
-        self.embedding_function = self._get_embedding_function()
+        self.embedding_function = embedding_function or self._get_embedding_function()
+        self.embedding_cache = None
+        if self.settings.EMBEDDING_CACHE_SIZE > 0:
+            self.embedding_cache = EmbeddingCache(
+                max_entries=self.settings.EMBEDDING_CACHE_SIZE,
+                mmap_path=self.settings.EMBEDDING_CACHE_MMAP_PATH,
+                mmap_slots=self.settings.EMBEDDING_CACHE_MMAP_SLOTS,
+                fingerprint=embedding_fingerprint(self.settings),
+            )
+        self.embedding_batcher = None
+        if self.settings.EMBEDDING_BATCHING_ENABLED:
+            self.embedding_batcher = EmbeddingBatcher(
+                self.embedding_function,
+                max_batch_size=self.settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=self.settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+            )
         self.client = None
         self.collection = None
+        self.space = "cosine"
+        self.min_similarity = self.settings.RETRIEVAL_MIN_SIMILARITY
+        self.partitions = {}
+        self._partition_collections = {}
 
         try:
             logger.info(f"Connecting to ChromaDB at: {self.settings.CHROMA_PERSIST_PATH}")
             self.client = chromadb.PersistentClient(path=str(self.settings.CHROMA_PERSIST_PATH))
             
+            # Queries are embedded here, never by Chroma; opening without an embedding
+            # function also accepts whatever function (if any) the collection recorded.
             self.collection = self.client.get_collection(
                 name=self.settings.CHROMA_COLLECTION_NAME,
-                embedding_function=self.embedding_function,
+                embedding_function=None,
             )
+            self.space = distance_space(self.collection)
+            self.min_similarity = self._calibrated_min_similarity()
+            self.partitions = self._load_partitions()
+            if self.space == "l2":
+                logger.warning(
+                    f"Collection '{self.settings.CHROMA_COLLECTION_NAME}' uses the l2 space, where 1 - distance is "
+                    f"not a calibrated similarity. Run `python migrate_vector_database.py` or calibrate the cutoff "
+                    f"with `python -m app.legal_agent.tools.score_calibration`."
+                )
             
             logger.info(
                 f"✅ Connected to collection '{self.settings.CHROMA_COLLECTION_NAME}'. "
                 f"Total items: {self.collection.count()}. "
-                f"Using device: '{self.device.upper()}'."
+                f"Using device: '{self.device.upper()}'. "
+                f"Space: '{self.space}', min similarity: {self.min_similarity}, "
+                f"document partitions: {len(self.partitions)}."
             )
         except Exception as e:
             logger.error(f"❌ Critical error connecting to ChromaDB: {e}", exc_info=True)
-            logger.error("Please ensure you have run the build_vector_database script and the config path is correct.")
+            logger.error("Please ensure you have run `python build_vector_database.py` and the config path is correct.")
             raise
 
     def _get_device(self):
@@ -43,46 +105,158 @@ class VectorRetriever:
         return "cpu"
 
     def _get_embedding_function(self):
-        logger.info(f"Using embedding model: {self.settings.EMBEDDING_MODEL_NAME}")
-        return embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=self.settings.EMBEDDING_MODEL_NAME,
-            device=self.device,
-            normalize_embeddings=False,
+        return get_embedding_function(self.settings, self.device)
+
+    def _calibrated_min_similarity(self) -> float:
+        calibration = load_calibration(self.settings, self.settings.CHROMA_COLLECTION_NAME)
+        if calibration is None:
+            return self.settings.RETRIEVAL_MIN_SIMILARITY
+        if calibration.get("space") != self.space:
+            logger.warning(
+                f"Score calibration was computed for space '{calibration.get('space')}' but the collection "
+                f"uses '{self.space}'; falling back to RETRIEVAL_MIN_SIMILARITY. Re-run the calibration."
+            )
+            return self.settings.RETRIEVAL_MIN_SIMILARITY
+        return calibration["threshold"]
+
+    def _load_partitions(self) -> dict:
+        manifest = load_partition_manifest(self.settings, self.settings.CHROMA_COLLECTION_NAME)
+        if manifest is None:
+            return {}
+        if (
+            manifest.get("collection_id") != str(self.collection.id)
+            or manifest.get("index_version") != self._index_version()
+        ):
+            logger.warning(
+                "Document partitions are out of date with the collection and will not be used; "
+                "rebuild them with `python -m app.legal_agent.tools.document_scope`."
+            )
+            return {}
+        return {name: info["collection"] for name, info in manifest.get("documents", {}).items()}
+
+    def _partition(self, document_name: str):
+        collection = self._partition_collections.get(document_name)
+        if collection is None:
+            collection = self.client.get_collection(self.partitions[document_name])
+            self._partition_collections[document_name] = collection
+        return collection
+
+    def _scoped_collections(self, filters) -> list[tuple]:
+        """Collections to query for ``filters``, each with its ``where`` clause.
+
+        A scope of a few documents is served from their partitions, whose small
+        HNSW graphs are searched exhaustively; wider scopes, or documents without
+        a partition, filter the main collection. Both filter on ``chapter``,
+        which the main collection only carries for units built since it was added.
+        """
+        document_names = (filters or {}).get("document_names")
+        if not document_names:
+            return [(self.collection, None)]
+        chapters = filters.get("chapters")
+        if (
+            len(document_names) <= self.settings.RETRIEVAL_MAX_PARTITIONS
+            and all(name in self.partitions for name in document_names)
+        ):
+            where = {"chapter": {"$in": chapters}} if chapters else None
+            return [(self._partition(name), where) for name in document_names]
+        where = {"document_name": {"$in": document_names}}
+        if chapters:
+            where = {"$and": [where, {"chapter": {"$in": chapters}}]}
+        return [(self.collection, where)]
+
+    def embed(self, texts: list[str]) -> list:
+        encode = self.embedding_batcher or self.embedding_function
+        if self.embedding_cache is None:
+            embeddings = encode(texts)
+        else:
+            embeddings = [self.embedding_cache.get(text) for text in texts]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                computed = encode([texts[i] for i in missing])
+                for i, embedding in zip(missing, computed):
+                    embeddings[i] = self.embedding_cache.put(texts[i], embedding)
+        if self.space == "ip" and embeddings:
+            # The index holds unit vectors, so the query must be one too for the dot product to be a cosine.
+            return list(normalize_rows(embeddings))
+        return embeddings
+
+    def similarity(self, distance: float) -> float:
+        return similarity_from_distance(distance)
+
+    def _index_version(self):
+        return index_version(self.settings, self.settings.CHROMA_COLLECTION_NAME)
+
+    def collection_fingerprint(self) -> str:
+        if not self.collection:
+            return ""
+        return (
+            f"{self.collection.name}:{self.collection.id}:{self.collection.count()}:"
+            f"{self._index_version()}"
         )
 
-    def search(self, query_text: str, n_results: int = 5) -> list[dict]:
+    def warm_up(self):
+        if not self.collection:
+            return
+        self.search_many(["khởi động"], n_results=1)
+
+    def _format_hits(self, ids, metadatas, distances) -> list[dict]:
+        formatted_results = []
+        for res_id, metadata, distance in zip(ids, metadatas, distances):
+            similarity = self.similarity(distance)
+
+            if similarity >= self.min_similarity:
+                clean_result = {
+                    "id": res_id,
+                    "document_name": metadata.get("document_name"),
+                    "content": metadata.get("content"),
+                    "context": metadata.get("context"),
+                    "similarity": round(similarity, 4),
+                }
+                formatted_results.append(clean_result)
+        return formatted_results
+
+    def search(self, query_text: str, n_results: int = 5, filters: dict = None) -> list[dict]:
+        return self.search_many([query_text], n_results, filters)
+
+    def search_many(self, queries: list[str], n_results: int = 5, filters: dict = None) -> list[dict]:
+        """Search several queries with one batched encode and one Chroma call per collection.
+
+        ``filters`` (``document_names``, ``chapters``) restrict the search to
+        those documents. Hits are deduplicated by id (keeping the best
+        similarity) and returned sorted by similarity, highest first.
+        """
         if not self.collection:
             logger.warning("Collection does not exist, search cannot be performed.")
             return []
 
+        queries = list(dict.fromkeys(q for q in queries if isinstance(q, str) and q.strip()))
+        if not queries:
+            return []
+
         try:
-            results = self.collection.query(
-                query_texts=[query_text],
-                n_results=n_results,
-                include=["metadatas", "distances"],
-            )
-            
-            formatted_results = []
-            if results and results["ids"][0]:
-                for i, res_id in enumerate(results["ids"][0]):
-                    metadata = results["metadatas"][0][i]
-                    distance = results["distances"][0][i]
-                    
-                    
-                    similarity = 1 - distance
-                    
-                    
-                    if similarity > 0.4:
-                        clean_result = {
-                            "id": res_id,
-                            "document_name": metadata.get("document_name"),
-                            "content": metadata.get("content"),
-                            "context": metadata.get("context"),
-                            "similarity": round(similarity, 4),
-                        }
-                        formatted_results.append(clean_result)
-        
-            return formatted_results
+            query_embeddings = self.embed(queries)
+            per_query = [[] for _ in queries]
+            for collection, where in self._scoped_collections(filters):
+                results = collection.query(
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    where=where,
+                    include=["metadatas", "distances"],
+                )
+                for hits, ids, metadatas, distances in zip(
+                    per_query, results["ids"], results["metadatas"], results["distances"]
+                ):
+                    hits.extend(self._format_hits(ids, metadatas, distances))
         except Exception as e:
             logger.error(f"Error querying ChromaDB: {e}", exc_info=True)
             return []
+
+        unique_hits = {}
+        for hits in per_query:
+            # Several partitions answer each query; keep its n_results best overall.
+            for hit in sorted(hits, key=lambda x: x["similarity"], reverse=True)[:n_results]:
+                current = unique_hits.get(hit["id"])
+                if current is None or hit["similarity"] > current["similarity"]:
+                    unique_hits[hit["id"]] = hit
+
+        return sorted(unique_hits.values(), key=lambda x: x["similarity"], reverse=True)
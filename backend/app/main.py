@@ -1,12 +1,17 @@
+import asyncio
 import logging
 import sys
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
 from starlette.middleware.cors import CORSMiddleware
 
 from .api.v1 import chat
+from .core.metrics import render_latest
 from .core.settings import settings
+from .legal_agent.agent.agent_runner import get_agent_runner
 
 
 log_filename = datetime.now().strftime(f"backend_log_%Y-%m-%d.log")
@@ -23,10 +28,44 @@ logging.basicConfig(
     ]
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _build_and_warm_up_runner():
+    runner = get_agent_runner()
+    runner.warm_up()
+
+
+async def _warm_up_agent_runner(app: FastAPI):
+    try:
+        await asyncio.to_thread(_build_and_warm_up_runner)
+        app.state.agent_status = "ready"
+        logger.info("✅ Agent runner is ready to serve requests.")
+    except Exception as e:
+        app.state.agent_status = "failed"
+        app.state.agent_error = str(e)
+        logger.error(f"❌ Agent runner warm-up failed: {e}", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.agent_status = "loading"
+    app.state.agent_error = None
+    warm_up_task = asyncio.create_task(_warm_up_agent_runner(app))
+    yield
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+    elif app.state.agent_status == "ready":
+        semantic_cache = get_agent_runner().semantic_cache
+        if semantic_cache is not None:
+            await asyncio.to_thread(semantic_cache.flush)
+
+
 app = FastAPI(
     title="LegalAgent API",
     version="1.0",
     description="Backend service for the LegalAgent application",
+    lifespan=lifespan,
 )
 
 
@@ -44,4 +83,18 @@ app.include_router(chat.router, prefix="/api/v1", tags=["Chat"])
 
 @app.get("/health", status_code=200, tags=["Health"])
 def health_check():
-    return {"status": "ok"}
+    agent_status = getattr(app.state, "agent_status", "loading")
+    body = {"status": agent_status}
+    if agent_status == "failed":
+        body["error"] = app.state.agent_error
+    if agent_status != "ready":
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics():
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Metrics are disabled."})
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
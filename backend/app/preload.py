@@ -0,0 +1,44 @@
+"""Load read-only resources in a pre-fork server's master process.
+
+Run from the gunicorn master (see ``gunicorn.conf.py``) before workers are
+forked: the embedding and reranker weights and the unit store are loaded once
+and shared copy-on-write, so memory stays roughly flat as workers are added.
+Nothing here runs inference, opens Chroma or starts thread pools, none of
+which survive a fork.
+"""
+import gc
+import logging
+import time
+
+import torch
+
+from .core.settings import settings
+from .legal_agent.tools.embedding_backend import get_embedding_function
+from .legal_agent.tools.reranker import load_cross_encoder
+from .legal_agent.tools.unit_store import build_unit_store, is_unit_store_stale
+
+logger = logging.getLogger(__name__)
+
+
+def preload_shared_resources():
+    start_time = time.perf_counter()
+    if is_unit_store_stale(settings.PARSED_JSON_DIR, settings.UNIT_STORE_PATH):
+        build_unit_store(settings.PARSED_JSON_DIR, settings.UNIT_STORE_PATH)
+
+    if torch.cuda.is_available():
+        logger.warning("CUDA is not fork-safe; models will be loaded in each worker instead.")
+    elif settings.EMBEDDING_BACKEND != "torch":
+        # ONNX Runtime sessions own thread pools that do not survive fork; the
+        # exported models are small, so each worker loads its own.
+        logger.info(f"Embedding backend '{settings.EMBEDDING_BACKEND}' is loaded per worker.")
+    else:
+        # Models are cached at class/module level, so workers reuse these instances.
+        get_embedding_function(settings, "cpu")
+        if settings.RERANK_ENABLED:
+            load_cross_encoder(settings.RERANKER_MODEL_NAME, "cpu")
+
+    # Move everything allocated so far out of the GC's reach, so collections in
+    # the workers do not touch (and thereby copy) the shared pages.
+    gc.collect()
+    gc.freeze()
+    logger.info(f"✅ Preloaded shared resources in {time.perf_counter() - start_time:.1f}s.")
@@ -0,0 +1,85 @@
+"""Compare the sequential and fan-out case_analysis graphs on a fake LLM.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.case_analysis_graph --runs 5 --llm-latency 0.5
+
+Every LLM call sleeps ``--llm-latency`` seconds and every retrieval call sleeps
+``--retrieval-latency`` plus ``--query-latency`` per keyword, so the reported
+wall times reflect only the graph's critical path.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from app.core.settings import Settings
+from app.legal_agent.agent.agent_runner import LegalAgentRunner
+
+from .fakes import FakeLegalLLM, FakeUnitStore, FakeVectorRetriever
+
+QUERY = (
+    "Ông An mất không để lại di chúc, có vợ là bà Bình và hai con. Con trai cả đã bán "
+    "một phần đất thừa kế cho ông Chi trước khi chia di sản. Việc mua bán này có hợp pháp không?"
+)
+
+
+async def run_once(runner: LegalAgentRunner) -> float:
+    start_time = time.perf_counter()
+    async for _ in runner.stream_run(QUERY):
+        pass
+    return time.perf_counter() - start_time
+
+
+async def bench_mode(parallel: bool, args) -> dict:
+    settings = Settings(
+        PARALLEL_CASE_ANALYSIS_ENABLED=parallel,
+        SPECULATIVE_ROUTING_ENABLED=False,
+        SEMANTIC_CACHE_ENABLED=False,
+        CONTEXT_HYDRATION_ENABLED=False,
+        # Every run repeats one query; the memo cache would answer all but the first.
+        LLM_MEMO_CACHE_ENABLED=False,
+    )
+    runner = LegalAgentRunner(
+        settings,
+        llm=FakeLegalLLM(route="case_analysis", latency=args.llm_latency),
+        vector_retriever=FakeVectorRetriever(
+            call_latency=args.retrieval_latency, query_latency=args.query_latency
+        ),
+        unit_store=FakeUnitStore(),
+    )
+    timings = [await run_once(runner) for _ in range(args.runs)]
+    return {
+        "mean_seconds": round(statistics.mean(timings), 4),
+        "median_seconds": round(statistics.median(timings), 4),
+        "min_seconds": round(min(timings), 4),
+    }
+
+
+async def main(args):
+    sequential = await bench_mode(False, args)
+    parallel = await bench_mode(True, args)
+    reduction = sequential["median_seconds"] - parallel["median_seconds"]
+    results = {
+        "benchmark": "case_analysis_graph",
+        "params": vars(args),
+        "sequential": sequential,
+        "parallel": parallel,
+        "critical_path_reduction_seconds": round(reduction, 4),
+        "critical_path_reduction_pct": round(100 * reduction / sequential["median_seconds"], 2),
+    }
+    print(json.dumps(results, indent=2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--retrieval-latency", type=float, default=0.05)
+    parser.add_argument("--query-latency", type=float, default=0.1)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,26 @@
+import json
+import platform
+import time
+
+import numpy as np
+
+
+def percentiles(values: list[float], points=(50, 90, 95, 99)) -> dict:
+    if not values:
+        return {}
+    return {f"p{p}": round(float(np.percentile(values, p)), 2) for p in points}
+
+
+def emit_results(results: dict, output_path: str = None):
+    """Print results as JSON and optionally write them to ``output_path`` for later comparison."""
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **results,
+    }
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    print(text)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text)
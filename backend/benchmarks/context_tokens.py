@@ -0,0 +1,79 @@
+"""Report prompt-context token counts before and after compact formatting.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.context_tokens [--keywords 8] [--per-keyword 3] [--parsed-json]
+
+By default the hits come from the synthetic ``FakeVectorRetriever``. With
+``--parsed-json`` the first units of ``PARSED_JSON_DIR`` are used instead, which
+gives realistic Vietnamese content lengths.
+"""
+import argparse
+import glob
+import json
+import os
+
+from app.core.settings import settings
+from app.legal_agent.tools.context_formatter import format_context
+from app.legal_agent.tools.token_counter import count_tokens
+
+from .fakes import FakeVectorRetriever
+
+KEYWORDS = [
+    "quyền thừa kế", "di chúc", "hàng thừa kế", "hợp đồng mua bán", "quyền sử dụng đất",
+    "giao dịch dân sự vô hiệu", "người thứ ba ngay tình", "thời hiệu khởi kiện",
+    "chia di sản", "tài sản chung của vợ chồng",
+]
+
+
+def load_parsed_units(limit: int) -> list[dict]:
+    units = []
+    for filepath in sorted(glob.glob(os.path.join(settings.PARSED_JSON_DIR, "*.json"))):
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        doc_name = data.get("document", {}).get("name", "Unknown Document")
+        for unit in data.get("units", []):
+            units.append({
+                "id": unit["id"],
+                "document_name": doc_name,
+                "content": unit.get("content"),
+                "context": unit.get("context"),
+                "similarity": 0.5,
+            })
+            if len(units) >= limit:
+                return units
+    return units
+
+
+def main(args):
+    if args.parsed_json:
+        hits = load_parsed_units(args.keywords * args.per_keyword)
+    else:
+        retriever = FakeVectorRetriever(call_latency=0, query_latency=0)
+        hits = retriever.search_many(KEYWORDS[: args.keywords], n_results=args.per_keyword)
+
+    model_name = settings.LLM_MODEL_NAME
+    before = count_tokens(json.dumps(hits, indent=2, ensure_ascii=False), model_name)
+    after = count_tokens(format_context(hits, model_name=model_name), model_name)
+    results = {
+        "benchmark": "context_tokens",
+        "source": "parsed_json" if args.parsed_json else "synthetic",
+        "units": len(hits),
+        "json_indent_tokens": before,
+        "compact_tokens": after,
+        "saved_tokens": before - after,
+        "saved_pct": round(100 * (before - after) / before, 2) if before else 0.0,
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keywords", type=int, default=8)
+    parser.add_argument("--per-keyword", type=int, default=3)
+    parser.add_argument("--parsed-json", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,115 @@
+"""Compare embedding backends on encode latency, throughput and recall@k.
+
+Usage (from the ``backend`` directory, after ``python save_model.py --export-onnx``):
+
+    python -m benchmarks.embedding_backends --backends torch onnx onnx-int8 --k 5
+
+``--queries`` accepts a JSONL file of ``{"query": ..., "relevant_ids": [...]}``
+records. Queries with ``relevant_ids`` are scored against those labels; the
+others are scored against the top-k returned by the first backend (the
+reference, normally ``torch``). Without a file a built-in query set is used.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import chromadb
+import numpy as np
+
+from app.core.settings import settings
+from app.legal_agent.tools.embedding_backend import get_embedding_function
+
+DEFAULT_QUERIES = [
+    "quyền thừa kế theo pháp luật", "người thừa kế theo di chúc", "hàng thừa kế thứ nhất",
+    "di chúc hợp pháp", "thời hiệu yêu cầu chia di sản", "giao dịch dân sự vô hiệu",
+    "hợp đồng mua bán tài sản", "người thứ ba ngay tình", "bồi thường thiệt hại ngoài hợp đồng",
+    "chấm dứt hợp đồng lao động", "trợ cấp thôi việc", "thời giờ làm việc bình thường",
+    "quyền sử dụng đất", "thu hồi đất", "tranh chấp đất đai", "tài sản chung của vợ chồng",
+    "ly hôn theo yêu cầu của một bên", "cấp dưỡng cho con sau ly hôn",
+    "xử phạt vi phạm hành chính giao thông", "nồng độ cồn khi điều khiển xe",
+    "tội trộm cắp tài sản", "cố ý gây thương tích", "thời hiệu khởi kiện", "năng lực hành vi dân sự",
+]
+
+
+def load_queries(path):
+    if not path:
+        return [{"query": q} for q in DEFAULT_QUERIES]
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def bench_backend(backend: str, queries: list[str], args):
+    backend_settings = settings.model_copy(
+        update={"EMBEDDING_BACKEND": backend, "EMBEDDING_NUM_THREADS": args.threads}
+    )
+    load_start = time.perf_counter()
+    embedding_function = get_embedding_function(backend_settings, "cpu")
+    load_seconds = time.perf_counter() - load_start
+
+    embedding_function(queries[:2])
+    single_latencies = []
+    for query in queries:
+        start_time = time.perf_counter()
+        embedding_function([query])
+        single_latencies.append((time.perf_counter() - start_time) * 1000)
+
+    start_time = time.perf_counter()
+    for _ in range(args.batch_repeats):
+        embeddings = embedding_function(queries)
+    batch_seconds = (time.perf_counter() - start_time) / args.batch_repeats
+
+    return embeddings, {
+        "load_seconds": round(load_seconds, 2),
+        "single_query_p50_ms": round(statistics.median(single_latencies), 2),
+        "single_query_p95_ms": round(float(np.percentile(single_latencies, 95)), 2),
+        "batch_throughput_qps": round(len(queries) / batch_seconds, 1),
+    }
+
+
+def top_k_ids(collection, embeddings, k):
+    results = collection.query(query_embeddings=[list(map(float, e)) for e in embeddings], n_results=k, include=[])
+    return results["ids"]
+
+
+def main(args):
+    records = load_queries(args.queries)
+    queries = [record["query"] for record in records]
+
+    collection = None
+    try:
+        client = chromadb.PersistentClient(path=str(settings.CHROMA_PERSIST_PATH))
+        collection = client.get_collection(settings.CHROMA_COLLECTION_NAME)
+    except Exception as e:
+        print(f"Collection unavailable, recall@k will be skipped: {e}")
+
+    results = {"benchmark": "embedding_backends", "queries": len(queries), "k": args.k, "backends": {}}
+    reference_ids = None
+    for backend in args.backends:
+        embeddings, stats = bench_backend(backend, queries, args)
+        if collection is not None:
+            retrieved = top_k_ids(collection, embeddings, args.k)
+            if reference_ids is None:
+                reference_ids = retrieved
+            recalls = []
+            for record, ids, ref_ids in zip(records, retrieved, reference_ids):
+                expected = set(record.get("relevant_ids") or ref_ids)
+                recalls.append(len(expected & set(ids)) / len(expected) if expected else 1.0)
+            stats[f"recall@{args.k}"] = round(statistics.mean(recalls), 4)
+        results["backends"][backend] = stats
+
+    print(json.dumps(results, indent=2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--queries", help="JSONL file with held-out queries.")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-repeats", type=int, default=5)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
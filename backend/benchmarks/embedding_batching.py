@@ -0,0 +1,129 @@
+"""Embedding throughput under concurrent users, with and without micro-batching.
+
+Usage (from the ``backend`` directory):
+
+    # simulated encoder: fixed cost per forward pass plus a cost per text
+    python -m benchmarks.embedding_batching --users 50 --requests 20
+    # the configured embedding model on CPU
+    python -m benchmarks.embedding_batching --model --users 50 --max-wait-ms 0 2 5
+
+Each user is a thread that embeds ``--keywords`` fresh texts per request, the
+way a retrieval node embeds its keywords. ``direct`` calls the embedding
+function from every thread; the other runs go through ``EmbeddingBatcher``
+with the given max wait.
+"""
+import argparse
+import threading
+import time
+
+from app.core.settings import settings
+from app.legal_agent.tools.embedding_backend import get_embedding_function
+from app.legal_agent.tools.embedding_batcher import EmbeddingBatcher
+
+from .common import emit_results, percentiles
+from .synthetic import TOPICS, HashingEmbeddingFunction
+
+
+class SimulatedEncoder:
+    """One forward pass at a time, costing ``per_call_ms`` plus ``per_text_ms`` per text."""
+
+    def __init__(self, per_call_ms: float, per_text_ms: float):
+        self.per_call = per_call_ms / 1000
+        self.per_text = per_text_ms / 1000
+        self.embedding_function = HashingEmbeddingFunction()
+        self._lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self._lock:
+            time.sleep(self.per_call + self.per_text * len(texts))
+            return self.embedding_function(texts)
+
+
+class RecordingEncoder:
+    def __init__(self, embedding_function):
+        self.embedding_function = embedding_function
+        self.batch_sizes = []
+
+    def __call__(self, texts):
+        self.batch_sizes.append(len(texts))
+        return self.embedding_function(texts)
+
+
+def make_texts(user: int, request: int, n_keywords: int) -> list[str]:
+    terms = [term for _, topic_terms in TOPICS for term in topic_terms]
+    return [
+        f"{terms[(user + request + k) % len(terms)]} trường hợp {user}-{request}-{k}"
+        for k in range(n_keywords)
+    ]
+
+
+def run(encode, args) -> dict:
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.users)
+
+    def user(user_id: int):
+        barrier.wait()
+        for request in range(args.requests):
+            texts = make_texts(user_id, request, args.keywords)
+            start_time = time.perf_counter()
+            encode(texts)
+            elapsed = (time.perf_counter() - start_time) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(args.users)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start_time
+    n_texts = args.users * args.requests * args.keywords
+    return {
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(args.users * args.requests / wall, 1),
+        "texts_per_second": round(n_texts / wall, 1),
+        "call_latency_ms": percentiles(latencies),
+    }
+
+
+def main(args):
+    if args.model:
+        base_encoder = get_embedding_function(settings, "cpu")
+        base_encoder(["khởi động"])
+    else:
+        base_encoder = SimulatedEncoder(args.per_call_ms, args.per_text_ms)
+
+    results = {"benchmark": "embedding_batching", "params": vars(args), "runs": {}}
+    recorder = RecordingEncoder(base_encoder)
+    results["runs"]["direct"] = {**run(recorder, args), "mean_batch_size": args.keywords}
+
+    for max_wait_ms in args.max_wait_ms:
+        recorder = RecordingEncoder(base_encoder)
+        batcher = EmbeddingBatcher(recorder, max_batch_size=args.max_batch_size, max_wait_ms=max_wait_ms)
+        stats = run(batcher, args)
+        sizes = recorder.batch_sizes
+        stats["batches"] = len(sizes)
+        stats["mean_batch_size"] = round(sum(sizes) / len(sizes), 1) if sizes else 0.0
+        results["runs"][f"batched_{max_wait_ms:g}ms"] = stats
+
+    emit_results(results, args.output)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="Embedding calls per user.")
+    parser.add_argument("--keywords", type=int, default=4, help="Texts per call.")
+    parser.add_argument("--max-batch-size", type=int, default=settings.EMBEDDING_BATCH_MAX_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, nargs="+", default=[0.0, settings.EMBEDDING_BATCH_MAX_WAIT_MS])
+    parser.add_argument("--model", action="store_true", help="Use the configured embedding model instead of the simulated encoder.")
+    parser.add_argument("--per-call-ms", type=float, default=8.0)
+    parser.add_argument("--per-text-ms", type=float, default=0.5)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
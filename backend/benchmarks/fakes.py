@@ -0,0 +1,119 @@
+"""Deterministic, offline stand-ins for the LLM and the vector retriever.
+
+They let benchmarks exercise the real LangGraph wiring of ``LegalAgentRunner``
+without network access, an OpenAI key, or a Chroma collection.
+"""
+import asyncio
+import time
+from typing import Any, Iterator
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeLegalLLM(BaseChatModel):
+    """Answers every agent prompt with a canned response after a fixed latency."""
+
+    route: str = "simple_rag"
+    latency: float = 0.2
+    token_latency: float = 0.0
+    answer: str = (
+        "Theo quy định của Bộ luật Dân sự, người thừa kế theo pháp luật được hưởng "
+        "phần di sản bằng nhau nếu cùng hàng thừa kế."
+    )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-legal-llm"
+
+    def _respond(self, prompt: str) -> str:
+        if "phân loại câu hỏi" in prompt:
+            return self.route
+        if "JSON" in prompt:
+            return '["quyền thừa kế", "di chúc", "hàng thừa kế"]'
+        return self.answer
+
+    def _tokens(self, text: str) -> list[str]:
+        words = text.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        text = self._respond(messages[-1].content)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        text = ""
+        async for chunk in self._astream(messages, stop, run_manager, **kwargs):
+            text += chunk.message.content
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for token in self._tokens(self._respond(messages[-1].content)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        await asyncio.sleep(self.latency)
+        for token in self._tokens(self._respond(messages[-1].content)):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class FakeVectorRetriever:
+    """Returns synthetic hits with a fixed per-call plus per-query latency."""
+
+    def __init__(self, call_latency: float = 0.02, query_latency: float = 0.03, n_documents: int = 50):
+        self.call_latency = call_latency
+        self.query_latency = query_latency
+        self.n_documents = n_documents
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def collection_fingerprint(self) -> str:
+        return "fake"
+
+    def warm_up(self):
+        pass
+
+    def search(self, query_text: str, n_results: int = 5, filters: dict = None) -> list[dict]:
+        return self.search_many([query_text], n_results, filters)
+
+    def search_many(self, queries: list[str], n_results: int = 5, filters: dict = None) -> list[dict]:
+        queries = list(dict.fromkeys(queries))
+        time.sleep(self.call_latency + self.query_latency * len(queries))
+        hits = {}
+        for query in queries:
+            for rank in range(n_results):
+                doc_index = (sum(map(ord, query)) + rank) % self.n_documents
+                unit_id = f"bo-luat-dan-su_điều-{doc_index}_khoản-{rank + 1}"
+                similarity = round(0.9 - 0.05 * rank, 4)
+                if unit_id not in hits or hits[unit_id]["similarity"] < similarity:
+                    hits[unit_id] = {
+                        "id": unit_id,
+                        "document_name": "Bộ luật Dân sự",
+                        "content": f"Nội dung quy định liên quan đến {query} (khoản {rank + 1}).",
+                        "context": f"Điều {doc_index}. Quy định về {query}",
+                        "similarity": similarity,
+                    }
+        return sorted(hits.values(), key=lambda x: x["similarity"], reverse=True)
+
+
+class FakeUnitStore:
+    def document_names(self) -> list[str]:
+        return ["Bộ luật Dân sự"]
+
+    def get_article_units(self, article_id: str) -> list[dict]:
+        return []
+
+    def get_many(self, unit_ids: list[str]) -> list[dict]:
+        return []
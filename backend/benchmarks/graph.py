@@ -0,0 +1,90 @@
+"""Graph-level benchmark: the full agent graph on the synthetic collection with a fake LLM.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.graph --runs 10 --llm-latency 0.2 --output graph.json
+
+Retrieval, context building and LangGraph orchestration are real; only the
+LLM is replaced, so the numbers isolate the agent's own overhead per route.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from .common import emit_results, percentiles
+from .fakes import FakeLegalLLM
+from .synthetic import build_synthetic_runner
+
+QUERIES = {
+    "simple_rag": "Quyền thừa kế theo pháp luật được quy định thế nào?",
+    "case_analysis": (
+        "Ông An mất không để lại di chúc, có vợ là bà Bình và hai con. Con trai cả đã bán "
+        "một phần đất thừa kế cho ông Chi trước khi chia di sản. Việc mua bán này có hợp pháp không?"
+    ),
+}
+
+
+async def run_once(runner, query: str) -> dict:
+    start_time = time.perf_counter()
+    start_cpu = time.process_time()
+    first_node = first_chunk = None
+    frames = 0
+    async for event in runner.stream_run(query):
+        # Encode like the SSE endpoint so per-frame cost shows up in CPU time.
+        json.dumps(event)
+        frames += 1
+        elapsed = (time.perf_counter() - start_time) * 1000
+        if event["type"] == "node_result" and first_node is None:
+            first_node = elapsed
+        elif event["type"] == "final_chunk" and first_chunk is None:
+            first_chunk = elapsed
+    return {
+        "total_ms": (time.perf_counter() - start_time) * 1000,
+        "cpu_ms": (time.process_time() - start_cpu) * 1000,
+        "first_node_ms": first_node,
+        "first_chunk_ms": first_chunk,
+        "frames": frames,
+    }
+
+
+async def bench_route(route: str, root: str, args) -> dict:
+    words = FakeLegalLLM().answer.split()
+    answer = " ".join(words[i % len(words)] for i in range(args.answer_words))
+    llm = FakeLegalLLM(route=route, latency=args.llm_latency, token_latency=args.token_latency, answer=answer)
+    runner = build_synthetic_runner(
+        root, llm, args.units, SEMANTIC_CACHE_ENABLED=False, LLM_MEMO_CACHE_ENABLED=False
+    )
+    runs = [await run_once(runner, QUERIES[route]) for _ in range(args.runs)]
+    return {
+        "total_ms": percentiles([run["total_ms"] for run in runs]),
+        "time_to_first_node_ms": percentiles([run["first_node_ms"] for run in runs if run["first_node_ms"]]),
+        "time_to_first_chunk_ms": percentiles([run["first_chunk_ms"] for run in runs if run["first_chunk_ms"]]),
+        "cpu_ms_per_stream": percentiles([run["cpu_ms"] for run in runs]),
+        "sse_frames_per_stream": runs[-1]["frames"],
+    }
+
+
+async def main(args):
+    results = {"benchmark": "graph", "params": vars(args)}
+    for route in args.routes:
+        with tempfile.TemporaryDirectory() as root:
+            results[route] = await bench_route(route, root, args)
+    emit_results(results, args.output)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--units", type=int, default=2000)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--answer-words", type=int, default=300, help="Length of the fake answers.")
+    parser.add_argument("--routes", nargs="+", choices=sorted(QUERIES), default=["simple_rag", "case_analysis"])
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
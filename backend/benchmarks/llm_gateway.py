@@ -0,0 +1,108 @@
+"""Tail latency of LLM calls through ``LLMGateway`` against the local mock OpenAI server.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.llm_gateway --calls 200 --slow-fraction 0.05 --slow-latency 2 --error-rate 0.02
+
+Runs the same call sequence with hedging off and on (retries always on) and
+reports latency percentiles, failures and how often a hedge won. The mock
+server seeds its slow/failing requests identically for both runs.
+"""
+import argparse
+import asyncio
+import time
+
+import uvicorn
+
+from app.core.settings import Settings
+from app.legal_agent.agent.prompt import RouterPrompt
+from app.legal_agent.tools.llm_gateway import LLMGateway
+
+from .common import emit_results, percentiles
+from .graph import QUERIES
+from .load_test import _free_port
+from .mock_openai import create_app
+
+
+async def bench_gateway(hedging: bool, args) -> dict:
+    mock_app = create_app(
+        latency=args.latency,
+        slow_fraction=args.slow_fraction,
+        slow_latency=args.slow_latency,
+        error_rate=args.error_rate,
+        seed=1,
+    )
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(mock_app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    settings = Settings(
+        OPENAI_API_KEY="mock",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{port}/v1",
+        LLM_HEDGING_ENABLED=hedging,
+        LLM_HEDGE_MIN_SAMPLES=args.warmup,
+        LLM_RETRY_BACKOFF_SECONDS=0.05,
+        # Every call repeats one prompt; the memo cache would answer all but the first.
+        LLM_MEMO_CACHE_ENABLED=False,
+    )
+    gateway = LLMGateway(settings)
+    prompt = RouterPrompt.format(query=QUERIES["simple_rag"])
+    timings = []
+    failures = 0
+    try:
+        for _ in range(args.warmup):
+            await gateway.ainvoke("router", prompt)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def call():
+            nonlocal failures
+            async with semaphore:
+                start_time = time.perf_counter()
+                try:
+                    await gateway.ainvoke("router", prompt)
+                except Exception:
+                    failures += 1
+                    return
+                timings.append((time.perf_counter() - start_time) * 1000)
+
+        await asyncio.gather(*(call() for _ in range(args.calls)))
+    finally:
+        await gateway.aclose()
+        server.should_exit = True
+        await server_task
+
+    return {
+        "latency_ms": percentiles(timings),
+        "failures": failures,
+        "upstream_requests": mock_app.state.requests,
+        **gateway.stats(),
+    }
+
+
+async def main(args):
+    results = {
+        "benchmark": "llm_gateway",
+        "params": vars(args),
+        "no_hedging": await bench_gateway(False, args),
+        "hedging": await bench_gateway(True, args),
+    }
+    emit_results(results, args.output)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="Calls used to learn the p95 before hedging.")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,156 @@
+"""Load generator for ``POST /api/v1/chat/stream`` with concurrent SSE clients.
+
+Usage (from the ``backend`` directory):
+
+    # against a running backend
+    python -m benchmarks.load_test --url http://localhost:8000 --clients 16 --requests 64
+
+    # fully offline: serve the real app in-process with a fake LLM and a synthetic collection
+    python -m benchmarks.load_test --spawn-fake-server --clients 16 --requests 64 --output load.json
+
+For each request it records the time to the first ``node_result`` event, the
+time to the first ``final_chunk`` and the total stream latency, and reports
+their percentiles together with overall throughput.
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import tempfile
+import time
+
+import httpx
+
+from .common import emit_results, percentiles
+from .graph import QUERIES
+
+
+async def stream_one(client: httpx.AsyncClient, url: str, query: str) -> dict:
+    start_time = time.perf_counter()
+    result = {"first_node_ms": None, "first_chunk_ms": None, "events": 0, "queued": False, "error": None}
+    try:
+        async with client.stream("POST", f"{url}/api/v1/chat/stream", json={"query": query}) as response:
+            if response.status_code != 200:
+                result["error"] = f"HTTP {response.status_code}"
+                return result
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[len("data:"):].strip())
+                elapsed = (time.perf_counter() - start_time) * 1000
+                result["events"] += 1
+                if event.get("type") == "queued":
+                    result["queued"] = True
+                elif event.get("type") == "node_result" and result["first_node_ms"] is None:
+                    result["first_node_ms"] = elapsed
+                elif event.get("type") == "final_chunk" and result["first_chunk_ms"] is None:
+                    result["first_chunk_ms"] = elapsed
+                elif event.get("type") == "error":
+                    result["error"] = event.get("data")
+    except httpx.HTTPError as e:
+        result["error"] = repr(e)
+    finally:
+        result["total_ms"] = (time.perf_counter() - start_time) * 1000
+    return result
+
+
+async def run_load(url: str, args) -> dict:
+    rng = random.Random(11)
+    queries = [QUERIES[rng.choice(args.routes)] for _ in range(args.requests)]
+    semaphore = asyncio.Semaphore(args.clients)
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        async def bounded(query: str):
+            async with semaphore:
+                return await stream_one(client, url, query)
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(bounded(query) for query in queries))
+        wall_seconds = time.perf_counter() - start_time
+
+    ok = [result for result in results if not result["error"]]
+    errors = [result["error"] for result in results if result["error"]]
+    return {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "errors": len(errors),
+        "queued": sum(result["queued"] for result in results),
+        "sample_errors": errors[:5],
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(ok) / wall_seconds, 3) if wall_seconds else 0.0,
+        "time_to_first_node_ms": percentiles([r["first_node_ms"] for r in ok if r["first_node_ms"] is not None]),
+        "time_to_first_chunk_ms": percentiles([r["first_chunk_ms"] for r in ok if r["first_chunk_ms"] is not None]),
+        "total_ms": percentiles([r["total_ms"] for r in ok]),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_with_fake_server(args) -> dict:
+    """Serve ``app.main:app`` in this process, with the agent runner swapped for a fake-LLM one."""
+    import uvicorn
+
+    from app import main as app_main
+    from app.api.v1 import chat
+
+    from .fakes import FakeLegalLLM
+    from .synthetic import build_synthetic_runner
+
+    with tempfile.TemporaryDirectory() as root:
+        # The router decision is fixed per fake LLM, so mixed routes are not supported here.
+        llm = FakeLegalLLM(route=args.routes[0], latency=args.llm_latency, token_latency=args.token_latency)
+        runner = build_synthetic_runner(
+            root, llm, args.units, SEMANTIC_CACHE_ENABLED=False, LLM_MEMO_CACHE_ENABLED=False
+        )
+        app_main.get_agent_runner = chat.get_agent_runner = lambda: runner
+
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(app_main.app, host="127.0.0.1", port=port, log_level="warning"))
+        server_task = asyncio.create_task(server.serve())
+        url = f"http://127.0.0.1:{port}"
+        async with httpx.AsyncClient() as client:
+            while True:
+                try:
+                    if (await client.get(f"{url}/health")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.1)
+        try:
+            return await run_load(url, args)
+        finally:
+            server.should_exit = True
+            await server_task
+
+
+async def main(args):
+    if args.spawn_fake_server:
+        load = await run_with_fake_server(args)
+    else:
+        load = await run_load(args.url.rstrip("/"), args)
+    emit_results({"benchmark": "load_test", "params": vars(args), **load}, args.output)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent SSE connections.")
+    parser.add_argument("--requests", type=int, default=32, help="Total requests to send.")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--routes", nargs="+", choices=sorted(QUERIES), default=["simple_rag"])
+    parser.add_argument("--spawn-fake-server", action="store_true")
+    parser.add_argument("--units", type=int, default=2000, help="Synthetic corpus size (fake server only).")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake LLM latency (fake server only).")
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
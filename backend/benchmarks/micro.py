@@ -0,0 +1,69 @@
+"""Microbenchmark of dense retrieval and context formatting on a synthetic Chroma collection.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.micro --units 2000 --iterations 200 --output micro.json
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from app.legal_agent.tools.context_formatter import format_context
+
+from .common import emit_results, percentiles
+from .synthetic import TOPICS, build_synthetic_environment
+
+
+def time_calls(fn, argument_sets) -> dict:
+    timings = []
+    for args in argument_sets:
+        start_time = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return {"calls": len(timings), **percentiles(timings)}
+
+
+def main(args):
+    from app.legal_agent.tools.vector_retriever import VectorRetriever
+
+    with tempfile.TemporaryDirectory() as root:
+        settings, embedding_function = build_synthetic_environment(
+            root, args.units, EMBEDDING_CACHE_SIZE=args.embedding_cache_size
+        )
+        retriever = VectorRetriever(settings, embedding_function=embedding_function)
+        retriever.warm_up()
+
+        rng = random.Random(7)
+        terms = [term for _, topic_terms in TOPICS for term in topic_terms]
+        single = [(rng.choice(terms), args.n_results) for _ in range(args.iterations)]
+        batched = [(rng.sample(terms, args.keywords), args.n_results) for _ in range(args.iterations)]
+
+        hits = retriever.search_many(terms, args.n_results)
+        formatting = [(hits[: args.n_results * args.keywords], args.token_budget, settings.LLM_MODEL_NAME)]
+
+        results = {
+            "benchmark": "micro",
+            "params": vars(args),
+            "search_ms": time_calls(retriever.search, single),
+            "search_many_ms": time_calls(retriever.search_many, batched),
+            "format_context_ms": time_calls(format_context, formatting * args.iterations),
+        }
+    emit_results(results, args.output)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=5)
+    parser.add_argument("--keywords", type=int, default=6)
+    parser.add_argument("--token-budget", type=int, default=6000)
+    parser.add_argument("--embedding-cache-size", type=int, default=0,
+                        help="0 disables the embedding cache so every call pays for encoding.")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,106 @@
+"""Local OpenAI-compatible ``/v1/chat/completions`` server for offline gateway and load tests.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.mock_openai --port 8900 --latency 0.2 --slow-fraction 0.05 --slow-latency 2
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 OPENAI_API_KEY=mock uvicorn app.main:app
+
+Answers come from ``FakeLegalLLM`` so the agent graph follows its normal path.
+A fraction of requests can be made slow or fail with HTTP 500 to exercise
+timeouts, retries and hedging.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .fakes import FakeLegalLLM
+
+
+def create_app(latency=0.2, token_latency=0.0, slow_fraction=0.0, slow_latency=2.0, error_rate=0.0, seed=None):
+    app = FastAPI()
+    answers = FakeLegalLLM()
+    rng = random.Random(seed)
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        if rng.random() < error_rate:
+            return JSONResponse(status_code=500, content={"error": {"message": "mock failure", "type": "server_error"}})
+
+        prompt = body["messages"][-1]["content"]
+        text = answers._respond(prompt)
+        tokens = answers._tokens(text)
+        usage = {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(tokens),
+            "total_tokens": len(prompt.split()) + len(tokens),
+        }
+        delay = slow_latency if rng.random() < slow_fraction else latency
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "mock")
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        def frame(delta, finish_reason=None, **extra):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+                **extra,
+            }
+            return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+        async def stream():
+            await asyncio.sleep(delay)
+            yield frame({"role": "assistant", "content": ""})
+            for token in tokens:
+                if token_latency:
+                    await asyncio.sleep(token_latency)
+                yield frame({"content": token})
+            yield frame({}, "stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield frame(None, usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--slow-fraction", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    app = create_app(args.latency, args.token_latency, args.slow_fraction, args.slow_latency, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,129 @@
+"""Small synthetic legal corpus, Chroma collection and unit store for offline benchmarks.
+
+Embeddings come from a deterministic feature-hashing function instead of the
+SentenceTransformer model, so nothing is downloaded and results are repeatable.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+
+import chromadb
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from app.core.settings import Settings
+from app.legal_agent.tools.unit_store import build_unit_store
+
+TOPICS = [
+    ("Bộ luật Dân sự", ["quyền thừa kế", "di chúc", "hàng thừa kế", "giao dịch dân sự", "hợp đồng mua bán",
+                        "người thứ ba ngay tình", "bồi thường thiệt hại", "năng lực hành vi dân sự"]),
+    ("Bộ luật Lao động", ["hợp đồng lao động", "trợ cấp thôi việc", "thời giờ làm việc", "kỷ luật lao động",
+                          "tiền lương", "chấm dứt hợp đồng lao động"]),
+    ("Luật Đất đai", ["quyền sử dụng đất", "thu hồi đất", "bồi thường khi thu hồi đất", "tranh chấp đất đai",
+                      "giấy chứng nhận quyền sử dụng đất"]),
+    ("Luật Hôn nhân và gia đình", ["tài sản chung của vợ chồng", "ly hôn", "cấp dưỡng", "quyền nuôi con"]),
+]
+
+
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Deterministic bag-of-syllables embedding via signed feature hashing."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = []
+        for text in input:
+            vector = np.zeros(self.dim, dtype=np.float32)
+            for token in re.findall(r"\w+", text.lower()):
+                digest = hashlib.md5(token.encode("utf-8")).digest()
+                index = int.from_bytes(digest[:4], "little") % self.dim
+                vector[index] += 1.0 if digest[4] & 1 else -1.0
+            norm = np.linalg.norm(vector)
+            embeddings.append(vector / norm if norm else vector)
+        return embeddings
+
+
+def generate_documents(n_units: int, seed: int = 13) -> list[dict]:
+    rng = random.Random(seed)
+    documents = {name: [] for name, _ in TOPICS}
+    for i in range(n_units):
+        doc_name, terms = TOPICS[i % len(TOPICS)]
+        article = i // (len(TOPICS) * 3) + 1
+        clause = i % 3 + 1
+        term, other = rng.sample(terms, 2)
+        slug = re.sub(r"\W+", "-", doc_name.lower())
+        documents[doc_name].append({
+            "id": f"{slug}_điều-{article}_khoản-{clause}",
+            "context": f"Điều {article}. Quy định về {term}",
+            "content": f"Khoản {clause}. Trường hợp liên quan đến {term} và {other} được giải quyết theo quy định của {doc_name}.",
+        })
+    return [{"document": {"name": name}, "units": units} for name, units in documents.items()]
+
+
+def build_synthetic_environment(root: str, n_units: int = 2000, **overrides) -> tuple[Settings, HashingEmbeddingFunction]:
+    """Create the corpus, unit store and Chroma collection under ``root``; return matching settings."""
+    data_dir = os.path.join(root, "data")
+    parsed_dir = os.path.join(data_dir, "parsed_json_output")
+    chroma_dir = os.path.join(data_dir, "chroma_db")
+    os.makedirs(parsed_dir, exist_ok=True)
+    os.makedirs(chroma_dir, exist_ok=True)
+
+    settings = Settings(
+        DATA_DIR=data_dir,
+        LOG_DIR=os.path.join(root, "logs"),
+        PARSED_JSON_DIR=parsed_dir,
+        CHROMA_PERSIST_PATH=chroma_dir,
+        UNIT_STORE_PATH=os.path.join(data_dir, "units.sqlite3"),
+        SEMANTIC_CACHE_PATH=os.path.join(data_dir, "semantic_cache.json"),
+        CHROMA_COLLECTION_NAME="synthetic_benchmark",
+        **overrides,
+    )
+    embedding_function = HashingEmbeddingFunction()
+
+    documents = generate_documents(n_units)
+    for i, document in enumerate(documents):
+        with open(os.path.join(parsed_dir, f"doc_{i}.json"), "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False)
+    build_unit_store(parsed_dir, settings.UNIT_STORE_PATH)
+
+    client = chromadb.PersistentClient(path=chroma_dir)
+    try:
+        client.delete_collection(settings.CHROMA_COLLECTION_NAME)
+    except Exception:
+        pass
+    collection = client.create_collection(
+        name=settings.CHROMA_COLLECTION_NAME,
+        embedding_function=None,
+        metadata={"hnsw:space": "cosine"},
+    )
+    units = [(doc["document"]["name"], unit) for doc in documents for unit in doc["units"]]
+    for i in range(0, len(units), 500):
+        batch = units[i:i + 500]
+        texts = [f"{unit['context']}\n{unit['content']}" for _, unit in batch]
+        collection.add(
+            ids=[unit["id"] for _, unit in batch],
+            embeddings=embedding_function(texts),
+            metadatas=[
+                {"document_name": doc_name, "content": unit["content"], "context": unit["context"]}
+                for doc_name, unit in batch
+            ],
+        )
+    return settings, embedding_function
+
+
+def build_synthetic_runner(root: str, llm, n_units: int = 2000, **overrides):
+    """A real ``LegalAgentRunner`` (graph, retriever, unit store) over the synthetic corpus and ``llm``."""
+    from app.legal_agent.agent.agent_runner import LegalAgentRunner
+    from app.legal_agent.tools.vector_retriever import VectorRetriever
+
+    settings, embedding_function = build_synthetic_environment(root, n_units, **overrides)
+    runner = LegalAgentRunner(
+        settings,
+        llm=llm,
+        vector_retriever=VectorRetriever(settings, embedding_function=embedding_function),
+    )
+    runner.warm_up()
+    return runner
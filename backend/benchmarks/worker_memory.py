@@ -0,0 +1,144 @@
+"""Report per-process memory of a multi-worker backend (Linux only).
+
+Usage (from the ``backend`` directory):
+
+    # spawn the server with 1, 2 and 4 workers and measure each
+    python -m benchmarks.worker_memory --spawn --workers 1 2 4
+    # same, without pre-fork sharing, for comparison
+    python -m benchmarks.worker_memory --spawn --server uvicorn --workers 1 2 4
+    # measure an already running server
+    python -m benchmarks.worker_memory --pid <master pid>
+
+RSS counts shared pages in every process, so it overstates the total. PSS
+splits each shared page between the processes mapping it and USS counts only
+private pages; with pre-fork sharing the per-worker USS stays small while the
+summed PSS stays roughly flat as workers are added.
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from .common import emit_results
+
+
+def read_memory_kb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {"rss_mb": fields.get("Rss", 0) / 1024, "pss_mb": fields.get("Pss", 0) / 1024, "uss_mb": private / 1024}
+
+
+def child_pids(pid: int) -> list[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields after the closing paren are fixed.
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def measure(master_pid: int) -> dict:
+    processes = {"master": master_pid}
+    processes.update({f"worker_{i}": pid for i, pid in enumerate(child_pids(master_pid))})
+    per_process = {}
+    for name, pid in processes.items():
+        try:
+            per_process[name] = {"pid": pid, **{k: round(v, 1) for k, v in read_memory_kb(pid).items()}}
+        except OSError:
+            continue
+    workers = [stats for name, stats in per_process.items() if name.startswith("worker_")]
+    return {
+        "processes": per_process,
+        "workers": len(workers),
+        "total_rss_mb": round(sum(p["rss_mb"] for p in per_process.values()), 1),
+        "total_pss_mb": round(sum(p["pss_mb"] for p in per_process.values()), 1),
+        "mean_worker_uss_mb": round(sum(w["uss_mb"] for w in workers) / len(workers), 1) if workers else 0.0,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port: int, n_workers: int, timeout: float):
+    """Wait until /health is ready; every worker warms up on its own, so give them time to finish."""
+    deadline = time.monotonic() + timeout
+    ready_since = None
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=5) as response:
+                if response.status == 200:
+                    ready_since = ready_since or time.monotonic()
+        except OSError:
+            pass
+        if ready_since and time.monotonic() - ready_since > 2 * n_workers:
+            return
+        time.sleep(1)
+    raise TimeoutError(f"Server on port {port} was not ready after {timeout:.0f}s.")
+
+
+def spawn_and_measure(server: str, n_workers: int, args) -> dict:
+    port = _free_port()
+    env = {**os.environ, "WEB_CONCURRENCY": str(n_workers), "BIND": f"127.0.0.1:{port}"}
+    if server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(n_workers),
+        ]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, n_workers, args.timeout)
+        return measure(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(args):
+    results = {"benchmark": "worker_memory", "params": vars(args)}
+    if args.pid:
+        results["measurement"] = measure(args.pid)
+    else:
+        results["runs"] = {str(n): spawn_and_measure(args.server, n, args) for n in args.workers}
+    emit_results(results, args.output)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pid", type=int, help="Master process of a running server.")
+    parser.add_argument("--spawn", action="store_true", help="Start the server for each --workers value.")
+    parser.add_argument("--server", choices=["gunicorn", "uvicorn"], default="gunicorn")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+    if not args.pid and not args.spawn:
+        parser.error("pass --pid or --spawn")
+    return args
+
+
+if __name__ == "__main__":
+    main(parse_args())
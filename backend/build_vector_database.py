@@ -0,0 +1,270 @@
+"""Build or incrementally refresh the Chroma collection from parsed JSON files.
+
+Usage (from the ``backend`` directory):
+
+    python build_vector_database.py [--workers 4] [--batch-size 256] [--prune] [--reset] [--space ip] [--partitions]
+
+Units are streamed file by file, hashed, and only new or changed units are
+embedded. Embedding runs in a process pool (one model copy per worker) while the
+main process upserts results into ``CHROMA_COLLECTION_NAME``. Completed files are
+recorded in a checkpoint so an interrupted build resumes where it stopped.
+In an inner-product (``ip``) collection embeddings are stored unit-normalized.
+To convert an existing collection, use ``migrate_vector_database.py``. With
+``--partitions`` the per-document partitions of changed documents are rebuilt
+for document-scoped search.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import chromadb
+
+from app.core.settings import settings
+from app.legal_agent.tools.document_scope import build_partitions, unit_filter_metadata
+from app.legal_agent.tools.vector_retriever import distance_space
+
+logger = logging.getLogger("build_vector_database")
+
+_worker_model = None
+
+
+def unit_to_document(unit: dict) -> str:
+    return "\n".join(part for part in (unit.get("context"), unit.get("content")) if part)
+
+
+def unit_content_hash(document: str, metadata: dict) -> str:
+    payload = json.dumps([document, metadata], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def file_signature(filepath: str) -> str:
+    stat = os.stat(filepath)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def iter_file_units(filepath: str):
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    doc_name = data.get("document", {}).get("name", "Unknown Document")
+    for unit in data.get("units", []):
+        document = unit_to_document(unit)
+        if not document:
+            continue
+        metadata = {
+            "document_name": doc_name,
+            "content": unit.get("content") or "",
+            "context": unit.get("context") or "",
+        }
+        metadata["content_hash"] = unit_content_hash(document, metadata)
+        # Scope filters (chapter, topic, effective date) stay out of the hash so
+        # adding them does not re-embed an existing collection; --reset stores them everywhere.
+        metadata.update(unit_filter_metadata(data.get("document", {}), unit))
+        yield unit["id"], document, metadata
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(torch_threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _embed_batch(documents: list[str], encode_batch_size: int, normalize: bool = False) -> list[list[float]]:
+    embeddings = _worker_model.encode(
+        documents,
+        batch_size=encode_batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=normalize,
+        show_progress_bar=False,
+    )
+    return embeddings.tolist()
+
+
+def load_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def fetch_existing_hashes(collection, page_size: int = 5000) -> dict:
+    existing = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        for unit_id, metadata in zip(page["ids"], page["metadatas"]):
+            existing[unit_id] = (metadata or {}).get("content_hash")
+        offset += len(page["ids"])
+    return existing
+
+
+def write_index_version(collection_name: str, stats: dict):
+    version_path = settings.CHROMA_PERSIST_PATH / "index_version.json"
+    versions = load_checkpoint(str(version_path))
+    versions[collection_name] = {"version": time.time(), **stats}
+    save_checkpoint(str(version_path), versions)
+
+
+def build(args):
+    start_time = time.perf_counter()
+    client = chromadb.PersistentClient(path=str(settings.CHROMA_PERSIST_PATH))
+    collection_name = settings.CHROMA_COLLECTION_NAME
+    checkpoint_path = str(settings.DATA_DIR / f"{collection_name}.build_checkpoint.json")
+
+    if args.reset:
+        try:
+            client.delete_collection(collection_name)
+            logger.info(f"Deleted existing collection '{collection_name}'.")
+        except Exception:
+            pass
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    # Units are embedded by the build workers, so no embedding function is recorded.
+    collection = client.get_or_create_collection(
+        name=collection_name, metadata={"hnsw:space": args.space}, embedding_function=None
+    )
+    # An existing collection keeps its space; match its vectors rather than --space.
+    space = distance_space(collection)
+    normalize = space == "ip"
+    if space != args.space:
+        logger.warning(f"Collection '{collection_name}' uses space '{space}', not '{args.space}'; keeping '{space}'.")
+    max_upsert = min(args.batch_size, client.get_max_batch_size())
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    existing_hashes = fetch_existing_hashes(collection)
+    logger.info(f"Collection '{collection_name}' currently holds {len(existing_hashes)} units.")
+
+    json_files = sorted(glob.glob(os.path.join(settings.PARSED_JSON_DIR, "*.json")))
+    seen_ids = set()
+    changed_documents = set()
+    stats = {"files": len(json_files), "skipped_files": 0, "units": 0, "unchanged": 0, "embedded": 0}
+
+    torch_threads = max(1, (os.cpu_count() or 1) // args.workers)
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(settings.EMBEDDING_MODEL_NAME, torch_threads),
+    ) as pool:
+        in_flight = {}
+        remaining_batches = {}
+        file_signatures = {}
+
+        def mark_file_done(file_name: str):
+            checkpoint[file_name] = file_signatures.pop(file_name)
+            save_checkpoint(checkpoint_path, checkpoint)
+            elapsed = time.perf_counter() - start_time
+            logger.info(
+                f"[{file_name}] done. Total embedded: {stats['embedded']} "
+                f"({stats['embedded'] / elapsed:.1f} units/s)."
+            )
+
+        def drain(block_until: int):
+            while len(in_flight) > block_until:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_name, ids, documents, metadatas = in_flight.pop(future)
+                    embeddings = future.result()
+                    for i in range(0, len(ids), max_upsert):
+                        collection.upsert(
+                            ids=ids[i:i + max_upsert],
+                            embeddings=embeddings[i:i + max_upsert],
+                            documents=documents[i:i + max_upsert],
+                            metadatas=metadatas[i:i + max_upsert],
+                        )
+                    stats["embedded"] += len(ids)
+                    # A file is only checkpointed once all of its batches are stored.
+                    remaining_batches[file_name] -= 1
+                    if remaining_batches[file_name] == 0:
+                        del remaining_batches[file_name]
+                        mark_file_done(file_name)
+
+        for filepath in json_files:
+            file_name = os.path.basename(filepath)
+            signature = file_signature(filepath)
+            units = list(iter_file_units(filepath))
+            seen_ids.update(unit_id for unit_id, _, _ in units)
+            stats["units"] += len(units)
+
+            if checkpoint.get(file_name) == signature:
+                stats["skipped_files"] += 1
+                stats["unchanged"] += len(units)
+                continue
+
+            pending = [u for u in units if existing_hashes.get(u[0]) != u[2]["content_hash"]]
+            stats["unchanged"] += len(units) - len(pending)
+            file_signatures[file_name] = signature
+            changed_documents.update(u[2]["document_name"] for u in pending)
+            if not pending:
+                mark_file_done(file_name)
+                continue
+
+            batches = [pending[i:i + args.batch_size] for i in range(0, len(pending), args.batch_size)]
+            remaining_batches[file_name] = len(batches)
+            for batch in batches:
+                ids = [u[0] for u in batch]
+                documents = [u[1] for u in batch]
+                metadatas = [u[2] for u in batch]
+                future = pool.submit(_embed_batch, documents, args.encode_batch_size, normalize)
+                in_flight[future] = (file_name, ids, documents, metadatas)
+                drain(block_until=args.workers * 2)
+
+        drain(block_until=0)
+
+    if args.prune:
+        stale_ids = [unit_id for unit_id in existing_hashes if unit_id not in seen_ids]
+        for i in range(0, len(stale_ids), max_upsert):
+            collection.delete(ids=stale_ids[i:i + max_upsert])
+        stats["pruned"] = len(stale_ids)
+
+    elapsed = time.perf_counter() - start_time
+    stats["seconds"] = round(elapsed, 2)
+    stats["units_per_second"] = round(stats["embedded"] / elapsed, 2) if elapsed else 0.0
+    if stats["embedded"] or stats.get("pruned"):
+        write_index_version(collection_name, stats)
+    if args.partitions:
+        # Pruned units may belong to any document, so every partition is rebuilt.
+        documents = None if stats.get("pruned") else changed_documents
+        stats["partitions"] = build_partitions(settings, client, documents=documents)
+
+    logger.info(f"✅ Build finished: {json.dumps(stats)}")
+    return stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build or refresh the Chroma vector database.")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--batch-size", type=int, default=256, help="Units per embedding task / upsert.")
+    parser.add_argument("--encode-batch-size", type=int, default=64, help="SentenceTransformer batch size.")
+    parser.add_argument("--prune", action="store_true", help="Delete units no longer present in the JSON files.")
+    parser.add_argument("--reset", action="store_true", help="Drop the collection and checkpoint before building.")
+    parser.add_argument(
+        "--partitions", action=argparse.BooleanOptionalAction, default=settings.CHROMA_PARTITIONS_ENABLED,
+        help="Rebuild the per-document partitions used by document-scoped search.",
+    )
+    parser.add_argument(
+        "--space", choices=["cosine", "ip"], default=settings.CHROMA_DISTANCE_SPACE,
+        help="Distance space of a new collection (ip stores unit-normalized vectors).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    build(parse_args())
@@ -0,0 +1,47 @@
+"""Pre-fork multi-worker serving: ``gunicorn -c gunicorn.conf.py app.main:app``.
+
+The master imports the app and loads the models once (``app.preload``);
+``WEB_CONCURRENCY`` uvicorn workers are then forked and share those pages.
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Model loading and warm-up happen in the app lifespan; streams can be long.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "600"))
+graceful_timeout = 30
+keepalive = 75
+
+# prometheus_client creates the files of unlabeled metrics when app.main is
+# imported, which preload_app does before any server hook runs, so the
+# directory has to exist (and be emptied of a previous run's files) now.
+multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if multiproc_dir:
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for name in os.listdir(multiproc_dir):
+        os.remove(os.path.join(multiproc_dir, name))
+
+
+def when_ready(server):
+    from app.preload import preload_shared_resources
+
+    preload_shared_resources()
+
+
+def post_fork(server, worker):
+    import torch
+
+    from app.core.settings import settings
+
+    if settings.EMBEDDING_NUM_THREADS <= 0:
+        # Split the cores between workers instead of each one using all of them.
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,116 @@
+"""Migrate the Chroma collection to unit-normalized vectors in an inner-product index.
+
+Usage (from the ``backend`` directory):
+
+    python migrate_vector_database.py [--calibration-queries labeled.jsonl] [--target-recall 0.95]
+
+Stored embeddings are copied page by page, normalized to float32 unit length and
+written to a new ``hnsw:space=ip`` collection, so nothing is re-embedded. The new
+collection then takes the original name and the old one is kept as
+``<name>_backup_<timestamp>`` (drop it with ``--drop-backup``). With labeled
+queries the similarity cutoff is recalibrated for the migrated collection.
+"""
+import argparse
+import json
+import logging
+import time
+
+import chromadb
+
+from app.core.settings import settings
+from app.legal_agent.tools.document_scope import build_partitions, load_partition_manifest
+from app.legal_agent.tools.embedding_backend import get_embedding_function
+from app.legal_agent.tools.score_calibration import calibrate_collection
+from app.legal_agent.tools.vector_retriever import VectorRetriever, distance_space, normalize_rows
+from build_vector_database import write_index_version
+
+logger = logging.getLogger("migrate_vector_database")
+
+
+def copy_normalized(source, target, page_size: int) -> int:
+    copied = 0
+    while True:
+        page = source.get(
+            include=["embeddings", "documents", "metadatas"], limit=page_size, offset=copied
+        )
+        if not page["ids"]:
+            return copied
+        target.add(
+            ids=page["ids"],
+            embeddings=normalize_rows(page["embeddings"]),
+            documents=page["documents"],
+            metadatas=page["metadatas"],
+        )
+        copied += len(page["ids"])
+        logger.info(f"Copied {copied} units.")
+
+
+def migrate(client, collection_name: str, page_size: int = 1000, drop_backup: bool = False) -> dict:
+    start_time = time.perf_counter()
+    source = client.get_collection(collection_name)
+    space = distance_space(source)
+    if space == "ip":
+        logger.info(f"Collection '{collection_name}' already uses the inner-product space; nothing to migrate.")
+        return {"migrated": False, "space": space}
+
+    staging_name = f"{collection_name}_ip_migration"
+    try:
+        # Left over from an interrupted run; the source collection is untouched until the swap.
+        client.delete_collection(staging_name)
+    except Exception:
+        pass
+    target = client.create_collection(
+        name=staging_name,
+        metadata={**(source.metadata or {}), "hnsw:space": "ip"},
+        embedding_function=None,
+    )
+
+    copied = copy_normalized(source, target, page_size)
+    if copied != source.count() or target.count() != copied:
+        raise RuntimeError(
+            f"Copied {copied} of {source.count()} units ({target.count()} stored); "
+            f"'{collection_name}' was left unchanged."
+        )
+
+    backup_name = f"{collection_name}_backup_{int(time.time())}"
+    source.modify(name=backup_name)
+    target.modify(name=collection_name)
+    if drop_backup:
+        client.delete_collection(backup_name)
+        backup_name = None
+
+    stats = {
+        "migrated": True,
+        "from_space": space,
+        "space": "ip",
+        "units": copied,
+        "backup": backup_name,
+        "seconds": round(time.perf_counter() - start_time, 2),
+    }
+    # Bumps the index version, which also invalidates the semantic answer cache.
+    write_index_version(collection_name, {"migration": stats})
+    logger.info(f"✅ Migration finished: {json.dumps(stats)}")
+    return stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=1000, help="Units copied per page.")
+    parser.add_argument("--drop-backup", action="store_true", help="Delete the original collection after the swap.")
+    parser.add_argument("--calibration-queries", help="JSONL of labeled queries used to recalibrate the cutoff.")
+    parser.add_argument("--n-results", type=int, default=20)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    args = parse_args()
+    client = chromadb.PersistentClient(path=str(settings.CHROMA_PERSIST_PATH))
+    stats = migrate(client, settings.CHROMA_COLLECTION_NAME, args.page_size, args.drop_backup)
+    if stats["migrated"] and load_partition_manifest(settings, settings.CHROMA_COLLECTION_NAME) is not None:
+        # Partitions copy the main collection's vectors, so they follow it to the new space.
+        build_partitions(settings, client)
+    if args.calibration_queries:
+        retriever = VectorRetriever(settings, embedding_function=get_embedding_function(settings, "cpu"))
+        calibrate_collection(settings, retriever, args.calibration_queries, args.n_results, args.target_recall)
@@ -1,8 +1,41 @@
+import argparse
+
+import tiktoken
 from sentence_transformers import SentenceTransformer
 
 model_name = "bkai-foundation-models/vietnamese-bi-encoder"
 
+
+def export_onnx(output_dir: str, quantization: str):
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    print(f"Exporting {model_name} to ONNX: {output_dir}")
+    model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    model.save(output_dir)
+
+    if quantization:
+        print(f"Exporting int8 dynamically quantized model ({quantization}).")
+        export_dynamic_quantized_onnx_model(model, quantization, output_dir)
+
+
+parser = argparse.ArgumentParser(description="Download (and optionally export) the embedding model.")
+parser.add_argument("--export-onnx", action="store_true", help="Also export the model for ONNX Runtime.")
+parser.add_argument(
+    "--quantization",
+    default="avx2",
+    choices=["", "arm64", "avx2", "avx512", "avx512_vnni"],
+    help="int8 quantization config for the ONNX export ('' to skip quantization).",
+)
+parser.add_argument("--output-dir", default="cache/embedding_onnx")
+args = parser.parse_args()
+
 print(f"Downloading and caching model: {model_name}")
 SentenceTransformer(model_name)
 
+print("Downloading and caching tokenizer: o200k_base")
+tiktoken.get_encoding("o200k_base")
+
+if args.export_onnx:
+    export_onnx(args.output_dir, args.quantization)
+
 print("Model cached successfully.")
@@ -13,6 +13,10 @@ def stream_from_backend(query: str):
     payload = {"query": query}
     try:
         with requests.post(STREAM_ENDPOINT, json=payload, stream=True, timeout=600) as response:
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "vài")
+                yield {"type": "error", "data": f"Hệ thống đang quá tải, vui lòng thử lại sau {retry_after} giây."}
+                return
             response.raise_for_status()
             for line in response.iter_lines():
                 if line:
@@ -36,10 +40,13 @@ def format_and_render_step(container, node_name, raw_data):
     container.subheader(f"Bước: {formatted_node_name}")
     
     if isinstance(raw_data, dict):
-        if node_name in ["keyword_extractor", "simple_keyword_extractor"]:
+        if node_name in ["keyword_extractor", "simple_keyword_extractor", "early_keyword_extractor"]:
             keywords = raw_data.get("extracted_keywords", [])
             if keywords:
                 container.markdown("- **Từ khóa được trích xuất:** " + ", ".join(f"`{k}`" for k in keywords))
+        elif node_name == "early_retriever":
+            hits = raw_data.get("retrieved_hits", [])
+            container.markdown(f"- **Tra cứu sơ bộ:** tìm thấy {len(hits)} điều luật liên quan.")
         elif node_name == "retriever":
             context_str = raw_data.get("retrieved_context", "[]")
             try:
@@ -103,6 +110,11 @@ if prompt := st.chat_input("Nhập tình huống hoặc câu hỏi pháp lý c
                             reasoning_details[node_name] = data
                             format_and_render_step(reasoning_container, node_name, data)
                     
+                    elif event_type == "queued":
+                        response_placeholder.info(
+                            f"⏳ Hệ thống đang bận, yêu cầu của bạn đang ở vị trí số {event.get('position')} trong hàng đợi..."
+                        )
+
                     elif event_type == "final_chunk":
                         chunk = event.get("data", "")
                         full_response += chunk